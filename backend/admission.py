@@ -0,0 +1,171 @@
+"""
+Admission control for video analysis.
+A fixed number of analyses may be in flight (running or waiting for a
+worker); beyond that requests are turned away with 429 straight away, so
+an overloaded server answers quickly instead of queueing without bound.
+Uploads are also probed before any decoding and rejected if too long or
+too large.
+"""
+
+import math
+import os
+import threading
+import time
+
+from fastapi import HTTPException
+
+from backend.jobs import JOB_WORKERS
+from backend.pose_scoring import VideoInfo
+
+# ================================
+# Configuration
+# ================================
+
+# Admitted analyses allowed to wait for a free worker. How many run at once
+# is the job executor's worker count, POSE_JOB_WORKERS.
+MAX_QUEUED_ANALYSES = int(os.environ.get("POSE_MAX_QUEUED_ANALYSES", 2 * JOB_WORKERS))
+
+# Retry-After sent before any analysis has finished to estimate from.
+DEFAULT_RETRY_AFTER_S = 5
+
+# Weight of the newest analysis in the running average duration.
+DURATION_SMOOTHING = 0.2
+
+# Pre-flight limits on uploaded videos; 0 disables a limit.
+MAX_VIDEO_SECONDS = float(os.environ.get("POSE_MAX_VIDEO_SECONDS", 900))
+MAX_VIDEO_SIDE = int(os.environ.get("POSE_MAX_VIDEO_SIDE", 3840))
+
+# ================================
+# Admission
+# ================================
+
+
+class Admission:
+    """One admitted analysis; release() frees its slot and is idempotent."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._admitted_at = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self, analyzed: bool = True):
+        """Free the slot.
+
+        analyzed=False for admissions that ended without an analysis (a
+        cache hit or a rejected upload), so they do not count towards
+        the average duration behind Retry-After.
+        """
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        duration_s = time.monotonic() - self._admitted_at if analyzed else None
+        self._controller._release(duration_s)
+
+
+class AdmissionController:
+    """Counts in-flight analyses and rejects those beyond the limit.
+
+    max_active must be the number of workers the analyses run on, since
+    that is what actually bounds how many run at once; it is only used to
+    size the capacity and the Retry-After estimate.
+    """
+
+    def __init__(
+        self,
+        max_active: int = JOB_WORKERS,
+        max_queued: int = MAX_QUEUED_ANALYSES,
+    ):
+        if max_active < 1 or max_queued < 0:
+            raise ValueError(
+                f"Need max_active >= 1 and max_queued >= 0, got {max_active}, {max_queued}"
+            )
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.rejected = 0
+        self._average_s = None
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_active + self.max_queued
+
+    def admit(self) -> Admission:
+        """Take a slot, or raise 429 with a Retry-After estimate."""
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                retry_after = self._retry_after()
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Server is busy ({self.in_flight} analyses in flight)",
+                    headers={"Retry-After": str(retry_after)},
+                )
+            self.in_flight += 1
+        return Admission(self)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "capacity": self.capacity,
+                "max_active": self.max_active,
+                "rejected": self.rejected,
+                "average_duration_s": self._average_s,
+            }
+
+    def _retry_after(self) -> int:
+        """Seconds until a slot is likely to free up.
+
+        With max_active analyses finishing in turn, one completes about
+        every average_duration / max_active seconds.
+        """
+        if self._average_s is None:
+            return DEFAULT_RETRY_AFTER_S
+        return max(1, math.ceil(self._average_s / self.max_active))
+
+    def _release(self, duration_s: float | None):
+        with self._lock:
+            self.in_flight -= 1
+            if duration_s is None:
+                return
+            if self._average_s is None:
+                self._average_s = duration_s
+            else:
+                self._average_s += DURATION_SMOOTHING * (duration_s - self._average_s)
+
+
+# ================================
+# Pre-flight Checks
+# ================================
+
+
+def check_video_limits(
+    info: VideoInfo,
+    max_seconds: float = MAX_VIDEO_SECONDS,
+    max_side: int = MAX_VIDEO_SIDE,
+):
+    """Reject a video from its container metadata, before any decoding.
+
+    Raises 400 for a file OpenCV cannot read and 413 for one over a limit.
+    """
+    if info.fps <= 0 or info.width <= 0 or info.height <= 0:
+        raise HTTPException(status_code=400, detail="Could not read the video")
+    if max_seconds and info.duration_s > max_seconds:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Video is {info.duration_s:.0f} s long; "
+                f"the limit is {max_seconds:.0f} s"
+            ),
+        )
+    if max_side and max(info.width, info.height) > max_side:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Video is {info.width}x{info.height}; "
+                f"the longest side may be at most {max_side} px"
+            ),
+        )
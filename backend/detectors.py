@@ -0,0 +1,228 @@
+"""
+One interface over pose-detection backends.
+A PoseDetector runs in one of MediaPipe's three modes (IMAGE, VIDEO or
+LIVE_STREAM) and reports the first pose in each frame as a float32 (33, 4)
+array of x, y, z and visibility, or None when no pose was found. The
+MediaPipe backend wraps a PoseLandmarker; backend.replay provides one that
+replays recorded landmarks, so everything built on the interface (pools,
+caches, benchmarks, load tests) can run without a model.
+"""
+
+from enum import Enum
+from typing import Callable, NamedTuple
+
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks.python import vision
+
+# ================================
+# Configuration
+# ================================
+
+# Backends create_detector can build.
+DETECTOR_BACKENDS = ("mediapipe", "replay")
+
+# ================================
+# Detector Interface
+# ================================
+
+
+class DetectorMode(Enum):
+    """Running modes, with the same meaning as MediaPipe's RunningMode.
+
+    IMAGE treats frames independently, VIDEO tracks across frames with
+    increasing timestamps, and LIVE_STREAM delivers results to a callback.
+    """
+
+    IMAGE = "image"
+    VIDEO = "video"
+    LIVE_STREAM = "live_stream"
+
+
+class Detection(NamedTuple):
+    """One frame's result.
+
+    landmarks is a float32 (33, 4) array, or None when no pose was found.
+    segmentation_mask is a float32 (height, width) array when the detector
+    was built to output masks and found a pose, otherwise None.
+    """
+
+    landmarks: np.ndarray | None
+    segmentation_mask: np.ndarray | None = None
+
+
+# Called as result_callback(detection, timestamp_ms) in LIVE_STREAM mode.
+ResultCallback = Callable[[Detection, int], None]
+
+NO_DETECTION = Detection(None)
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """Copy one pose's MediaPipe landmarks into a float32 (33, 4) array."""
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32
+    )
+
+
+class PoseDetector:
+    """Base class for pose detectors.
+
+    The public methods check the mode and, for VIDEO and LIVE_STREAM, that
+    timestamps increase, then call _detect(rgb_frame, timestamp_ms), which
+    subclasses implement; timestamp_ms is None in IMAGE mode. Subclasses
+    with a native asynchronous path override _detect_async.
+    """
+
+    backend = ""
+
+    def __init__(
+        self,
+        mode: DetectorMode = DetectorMode.VIDEO,
+        result_callback: ResultCallback | None = None,
+    ):
+        mode = DetectorMode(mode)
+        if (mode is DetectorMode.LIVE_STREAM) != (result_callback is not None):
+            raise ValueError(
+                "result_callback must be given in LIVE_STREAM mode and only then"
+            )
+        self.mode = mode
+        self._result_callback = result_callback
+        self._last_timestamp_ms = -1
+
+    def detect(self, rgb_frame: np.ndarray) -> Detection:
+        """Detect a pose in a standalone RGB image (IMAGE mode)."""
+        self._check_mode(DetectorMode.IMAGE)
+        return self._detect(rgb_frame, None)
+
+    def detect_for_video(self, rgb_frame: np.ndarray, timestamp_ms: int) -> Detection:
+        """Detect a pose in one RGB video frame (VIDEO mode)."""
+        self._check_mode(DetectorMode.VIDEO)
+        self._check_timestamp(timestamp_ms)
+        return self._detect(rgb_frame, timestamp_ms)
+
+    def detect_async(self, rgb_frame: np.ndarray, timestamp_ms: int):
+        """Send one RGB frame for detection (LIVE_STREAM mode).
+
+        The result arrives through result_callback, possibly on another
+        thread; backends may skip frames while busy.
+        """
+        self._check_mode(DetectorMode.LIVE_STREAM)
+        self._check_timestamp(timestamp_ms)
+        self._detect_async(rgb_frame, timestamp_ms)
+
+    def _detect(self, rgb_frame: np.ndarray, timestamp_ms: int | None) -> Detection:
+        raise NotImplementedError
+
+    def _detect_async(self, rgb_frame: np.ndarray, timestamp_ms: int):
+        self._result_callback(self._detect(rgb_frame, timestamp_ms), timestamp_ms)
+
+    def _check_mode(self, mode: DetectorMode):
+        if self.mode is not mode:
+            raise ValueError(
+                f"{self.backend} detector is in {self.mode.name} mode, not {mode.name}"
+            )
+
+    def _check_timestamp(self, timestamp_ms: int):
+        if timestamp_ms <= self._last_timestamp_ms:
+            raise ValueError(
+                f"Timestamps must increase: {timestamp_ms} after {self._last_timestamp_ms}"
+            )
+        self._last_timestamp_ms = timestamp_ms
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ================================
+# MediaPipe Backend
+# ================================
+
+
+class MediaPipeDetector(PoseDetector):
+    """PoseDetector backed by a MediaPipe PoseLandmarker model."""
+
+    backend = "mediapipe"
+
+    def __init__(
+        self,
+        model_path: str,
+        mode: DetectorMode = DetectorMode.VIDEO,
+        output_segmentation_masks: bool = False,
+        result_callback: ResultCallback | None = None,
+    ):
+        super().__init__(mode, result_callback)
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode[self.mode.name],
+            output_segmentation_masks=output_segmentation_masks,
+        )
+        if self.mode is DetectorMode.LIVE_STREAM:
+            options.result_callback = self._on_result
+        self._landmarker = vision.PoseLandmarker.create_from_options(options)
+
+    @staticmethod
+    def _to_detection(result) -> Detection:
+        if not result.pose_landmarks:
+            return NO_DETECTION
+        mask = None
+        if result.segmentation_masks:
+            mask = np.squeeze(np.array(result.segmentation_masks[0].numpy_view()))
+        return Detection(landmarks_to_array(result.pose_landmarks[0]), mask)
+
+    def _detect(self, rgb_frame: np.ndarray, timestamp_ms: int | None) -> Detection:
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        if timestamp_ms is None:
+            return self._to_detection(self._landmarker.detect(mp_image))
+        return self._to_detection(
+            self._landmarker.detect_for_video(mp_image, timestamp_ms)
+        )
+
+    def _detect_async(self, rgb_frame: np.ndarray, timestamp_ms: int):
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        self._landmarker.detect_async(mp_image, timestamp_ms)
+
+    def _on_result(self, result, output_image, timestamp_ms: int):
+        self._result_callback(self._to_detection(result), timestamp_ms)
+
+    def close(self):
+        self._landmarker.close()
+
+
+# ================================
+# Factory
+# ================================
+
+
+def create_detector(
+    backend: str = "mediapipe",
+    model_path: str | None = None,
+    mode: DetectorMode = DetectorMode.VIDEO,
+    output_segmentation_masks: bool = False,
+    result_callback: ResultCallback | None = None,
+    **replay_options,
+) -> PoseDetector:
+    """Build a detector by backend name (one of DETECTOR_BACKENDS).
+
+    model_path is required for "mediapipe"; replay_options are passed to
+    ReplayDetector for "replay", which ignores the model.
+    """
+    if backend == "mediapipe":
+        if model_path is None:
+            raise ValueError("The mediapipe backend needs a model_path")
+        return MediaPipeDetector(
+            model_path, mode, output_segmentation_masks, result_callback
+        )
+    if backend == "replay":
+        # Imported here because backend.replay builds on this module.
+        from backend.replay import ReplayDetector
+
+        return ReplayDetector(
+            mode=mode, result_callback=result_callback, **replay_options
+        )
+    raise ValueError(f"Unknown detector backend: {backend}. Available: {DETECTOR_BACKENDS}")
@@ -0,0 +1,174 @@
+"""
+Background analysis jobs.
+Video analysis runs on a bounded thread pool so the event loop stays free.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+
+from backend.landmarker_pool import POOL_SIZE
+from backend.pose_scoring import AnalysisCancelled
+
+# ================================
+# Configuration
+# ================================
+
+# One worker per pooled landmarker; extra workers would only wait on the pool.
+JOB_WORKERS = int(os.environ.get("POSE_JOB_WORKERS", POOL_SIZE))
+
+# Finished jobs kept around for polling before the oldest are dropped.
+JOB_HISTORY = int(os.environ.get("POSE_JOB_HISTORY", 256))
+
+# ================================
+# Jobs
+# ================================
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = {JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class Job:
+    """State of one analysis, shared between the worker thread and the API."""
+
+    def __init__(self, pose_name: str):
+        self.id = uuid.uuid4().hex
+        self.pose_name = pose_name
+        self.status = JobStatus.QUEUED
+        self.frames_done = 0
+        self.total_frames = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.cleanup = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == JobStatus.DONE:
+            return 1.0
+        if self.total_frames <= 0:
+            return 0.0
+        return min(self.frames_done / self.total_frames, 1.0)
+
+    def update_progress(self, frames_done: int, total_frames: int):
+        """Progress callback handed to process_video."""
+        self.frames_done = frames_done
+        self.total_frames = total_frames
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "pose_name": self.pose_name,
+            "status": self.status.value,
+            "progress": self.progress,
+            "frames_done": self.frames_done,
+            "total_frames": self.total_frames,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Runs jobs on a bounded executor and keeps their state for polling."""
+
+    def __init__(self, max_workers: int = JOB_WORKERS, history: int = JOB_HISTORY):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="analysis"
+        )
+        self._history = history
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pose_name: str, work, cleanup=None) -> Job:
+        """Queue work(job) and return the job immediately.
+
+        cleanup() runs once the job has finished, whatever the outcome.
+        """
+        job = Job(pose_name)
+        job.cleanup = cleanup
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, work)
+        return job
+
+    def add_completed(self, pose_name: str, result) -> Job:
+        """Record a job whose result is already known, e.g. from the cache."""
+        job = Job(pose_name)
+        job.result = result
+        self._finish(job, JobStatus.DONE)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a job; running jobs stop at their next frame."""
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+
+        job.cancel_event.set()
+        if job.future.cancel():
+            # Never started, so _run will not get the chance to clean up.
+            self._finish(job, JobStatus.CANCELLED)
+        return job
+
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self.cancel(job.id)
+        self._executor.shutdown(wait=True)
+
+    def _run(self, job: Job, work):
+        if job.cancel_event.is_set():
+            self._finish(job, JobStatus.CANCELLED)
+            return None
+
+        job.status = JobStatus.RUNNING
+        try:
+            job.result = work(job)
+        except AnalysisCancelled:
+            self._finish(job, JobStatus.CANCELLED)
+            return None
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, JobStatus.FAILED)
+            raise
+        self._finish(job, JobStatus.DONE)
+        return job.result
+
+    def _finish(self, job: Job, status: JobStatus):
+        job.status = status
+        job.finished_at = time.time()
+        cleanup, job.cleanup = job.cleanup, None
+        if cleanup is not None:
+            cleanup()
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.status in FINISHED_STATUSES]
+        excess = len(finished) - self._history
+        if excess <= 0:
+            return
+        finished.sort(key=lambda j: j.finished_at)
+        for job in finished[:excess]:
+            del self._jobs[job.id]
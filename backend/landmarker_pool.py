@@ -0,0 +1,200 @@
+"""
+Pre-warmed pose detector pools for the FastAPI backend.
+Instances are built once per inference profile and checked out per analysis.
+"""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from backend.pose_scoring import DEFAULT_PROFILE, load_pose_landmarker
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Configuration
+# ================================
+
+POOL_SIZE = int(os.environ.get("POSE_POOL_SIZE", os.cpu_count() or 1))
+
+# Profiles whose pools are built at startup; others are built on first use.
+PREWARM_PROFILES = [
+    name.strip()
+    for name in os.environ.get("POSE_PREWARM_PROFILES", DEFAULT_PROFILE).split(",")
+    if name.strip()
+]
+
+# How long a checkout waits for an idle landmarker before giving up.
+CHECKOUT_TIMEOUT_S = float(os.environ.get("POSE_CHECKOUT_TIMEOUT_S", 60))
+
+# Backoff between attempts to rebuild a landmarker that failed to load.
+REBUILD_RETRY_S = 1.0
+REBUILD_RETRY_MAX_S = 30.0
+
+# ================================
+# Pool
+# ================================
+
+
+class LandmarkerUnavailable(Exception):
+    """Raised when no landmarker becomes idle within the checkout timeout."""
+
+
+class LandmarkerPool:
+    """Fixed-size pool of pose detectors for one inference profile.
+
+    VIDEO-mode detectors carry tracking state from frame to frame, so one
+    that has seen a video would give different landmarks for the next.
+    Every checkout therefore gets an instance that has never run: the used
+    one is closed on return and a replacement is built in the background,
+    keeping model loading off the request path while the pool keeps up.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        profile: str = DEFAULT_PROFILE,
+        factory=load_pose_landmarker,
+    ):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        self.size = size
+        self.profile = profile
+        self._factory = factory
+        self._idle = queue.Queue()
+        self._closed = threading.Event()
+        # One worker per landmarker, so a burst of returns is rebuilt at once.
+        self._builder = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix=f"landmarker-{profile}"
+        )
+
+    def start(self, wait: bool = True):
+        """Build the pool's landmarkers.
+
+        With wait=True every one is built before returning, so requests
+        never pay for it. With wait=False only the first is and the rest
+        are built in the background, so a pool created by a request costs
+        that request a single model load.
+        """
+        self._idle.put(self._factory(self.profile))
+        for _ in range(self.size - 1):
+            if wait:
+                self._idle.put(self._factory(self.profile))
+            else:
+                self._builder.submit(self._add)
+
+    def close(self):
+        # Pending replacements still close the landmarkers they were given;
+        # ones waiting to retry a failed build give up.
+        self._closed.set()
+        self._builder.shutdown(wait=True)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _add(self):
+        """Build one landmarker into the pool, retrying until it succeeds.
+
+        A failed build would otherwise shrink the pool for good. Retries
+        back off and stop once the pool is closed.
+        """
+        delay = REBUILD_RETRY_S
+        while True:
+            try:
+                landmarker = self._factory(self.profile)
+            except Exception:
+                logger.exception(
+                    "Could not build a %s landmarker, retrying in %.0fs",
+                    self.profile,
+                    delay,
+                )
+                if self._closed.wait(delay):
+                    return
+                delay = min(delay * 2, REBUILD_RETRY_MAX_S)
+            else:
+                self._idle.put(landmarker)
+                return
+
+    def _replace(self, landmarker):
+        try:
+            landmarker.close()
+        except Exception:
+            logger.exception("Could not close a %s landmarker", self.profile)
+        self._add()
+
+    @contextmanager
+    def checkout(self, timeout: float | None = CHECKOUT_TIMEOUT_S):
+        """Borrow a fresh landmarker for one video; it is replaced afterwards.
+
+        Raises LandmarkerUnavailable if none is idle within timeout seconds
+        (None waits indefinitely).
+        """
+        try:
+            landmarker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise LandmarkerUnavailable(
+                f"No {self.profile} landmarker became available within {timeout}s"
+            ) from None
+        try:
+            yield landmarker
+        finally:
+            try:
+                self._builder.submit(self._replace, landmarker)
+            except RuntimeError:
+                # The pool is closing, so there is nothing to replace it for.
+                landmarker.close()
+
+
+class LandmarkerPools:
+    """One LandmarkerPool per inference profile."""
+
+    def __init__(self, size: int = POOL_SIZE, factory=load_pose_landmarker):
+        self.size = size
+        self._factory = factory
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def start(self, profiles=PREWARM_PROFILES):
+        for profile in profiles:
+            self.get(profile, wait=True)
+
+    def get(self, profile: str, wait: bool = False) -> LandmarkerPool:
+        """The pool for a profile, building it on first use.
+
+        Models are loaded outside the lock, which only guards the dict, so
+        checkouts for other profiles never wait on them. Concurrent first
+        requests for the same profile share the new pool and wait in
+        checkout for its landmarkers.
+        """
+        with self._lock:
+            pool = self._pools.get(profile)
+            if pool is not None:
+                return pool
+            pool = LandmarkerPool(self.size, profile, self._factory)
+            self._pools[profile] = pool
+
+        try:
+            pool.start(wait)
+        except BaseException:
+            with self._lock:
+                if self._pools.get(profile) is pool:
+                    del self._pools[profile]
+            pool.close()
+            raise
+        return pool
+
+    def checkout(
+        self, profile: str = DEFAULT_PROFILE, timeout: float | None = CHECKOUT_TIMEOUT_S
+    ):
+        return self.get(profile).checkout(timeout)
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
@@ -0,0 +1,166 @@
+"""
+Live scoring of webcam frames sent over a WebSocket.
+Each connection owns one VIDEO-mode landmarker. Frames that arrive while
+the previous one is still being processed replace each other, so only the
+newest is ever scored and latency stays bounded when the server is busy.
+"""
+
+import asyncio
+import os
+import struct
+import time
+
+import cv2
+import numpy as np
+
+from backend import metrics
+from backend.pose_scoring import (
+    MAX_INFERENCE_SIDE,
+    SCORED_JOINTS,
+    detect_landmarks,
+    resize_frame,
+    score_landmarks_xy,
+)
+from pose_utils import classify_pose_refined
+
+# ================================
+# Configuration
+# ================================
+
+# Concurrent live connections; each holds its own landmarker.
+LIVE_MAX_SESSIONS = int(os.environ.get("POSE_LIVE_MAX_SESSIONS", 4))
+
+# Raw frames start with this header: width, height, channels (3 = RGB,
+# 4 = RGBA), little-endian, followed by the pixel rows.
+RAW_FRAME_HEADER = struct.Struct("<HHB")
+
+_JPEG_MAGIC = b"\xff\xd8"
+_PNG_MAGIC = b"\x89PNG"
+
+# ================================
+# Frames
+# ================================
+
+
+class FrameError(ValueError):
+    """Raised for a frame message that cannot be decoded."""
+
+
+def decode_frame(payload: bytes) -> np.ndarray:
+    """Decode a JPEG, PNG or raw RGB/RGBA frame message into an RGB image.
+
+    Frames are produced in the detector's channel order: images decode
+    straight to RGB and raw RGB pixels are used in place, so no frame is
+    converted through BGR and back.
+    """
+    if payload.startswith(_JPEG_MAGIC) or payload.startswith(_PNG_MAGIC):
+        image = cv2.imdecode(
+            np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR_RGB
+        )
+        if image is None:
+            raise FrameError("Could not decode image")
+        return image
+
+    if len(payload) < RAW_FRAME_HEADER.size:
+        raise FrameError("Frame is too short")
+    width, height, channels = RAW_FRAME_HEADER.unpack_from(payload)
+    if channels not in (3, 4):
+        raise FrameError(f"Raw frames must have 3 or 4 channels, got {channels}")
+    pixels = payload[RAW_FRAME_HEADER.size :]
+    if len(pixels) != width * height * channels:
+        raise FrameError(
+            f"Expected {width * height * channels} pixel bytes, got {len(pixels)}"
+        )
+
+    image = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, channels)
+    if channels == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_RGBA2RGB)
+    return image
+
+
+class LatestFrame:
+    """Single-slot mailbox: a new frame replaces one that was not yet taken."""
+
+    def __init__(self):
+        self._item = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        if self._item is not None:
+            self.dropped += 1
+        self._item = item
+        self._ready.set()
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    async def get(self):
+        """The newest frame, or None once closed and empty."""
+        while self._item is None:
+            if self._closed:
+                return None
+            await self._ready.wait()
+            self._ready.clear()
+        item, self._item = self._item, None
+        return item
+
+
+# ================================
+# Session
+# ================================
+
+
+class LiveSession:
+    """One client's landmarker plus the pose it is scored against."""
+
+    def __init__(
+        self,
+        landmarker,
+        reference_angles: dict | None = None,
+        joints: list[str] = SCORED_JOINTS,
+        max_side: int | None = MAX_INFERENCE_SIDE,
+    ):
+        self._landmarker = landmarker
+        self._reference_angles = reference_angles
+        self._joints = joints
+        self._max_side = max_side
+        self._started = time.monotonic()
+        self._last_timestamp_ms = -1
+
+    def _timestamp_ms(self) -> int:
+        # VIDEO mode needs strictly increasing timestamps.
+        timestamp_ms = int((time.monotonic() - self._started) * 1000)
+        timestamp_ms = max(timestamp_ms, self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def process(self, payload: bytes) -> dict:
+        """Decode, detect, classify and score one frame message.
+
+        landmarks in the result is a float32 (33, 4) array, or None.
+        """
+        frame = resize_frame(decode_frame(payload), self._max_side)
+        array = detect_landmarks(self._landmarker, frame, self._timestamp_ms())
+        if array is None:
+            return {"landmarks": None, "classification": None, "score": None}
+
+        score = None
+        if self._reference_angles is not None:
+            with metrics.SCORE_SECONDS.time():
+                score = score_landmarks_xy(
+                    array[:, :2].astype(np.float64),
+                    self._reference_angles,
+                    self._joints,
+                )
+
+        return {
+            "landmarks": array,
+            "classification": classify_pose_refined(array[:, :2]),
+            "score": score,
+        }
+
+    def close(self):
+        self._landmarker.close()
@@ -2,16 +2,163 @@
 FastAPI Backend for Yoga Pose Scoring
 """
 
-import tempfile
+import asyncio
+import json
 import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, NamedTuple
 
 import numpy as np
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import (
+    FastAPI,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from backend import metrics
+from backend.admission import Admission, AdmissionController, check_video_limits
+from backend.jobs import JOB_WORKERS, JobManager, JobStatus
+from backend.landmarker_pool import POOL_SIZE, LandmarkerPools, LandmarkerUnavailable
+from backend.live import LIVE_MAX_SESSIONS, FrameError, LatestFrame, LiveSession
+from backend.parallel import PROCESS_WORKERS, ParallelAnalyzer
+from backend.pose_scoring import (
+    DEFAULT_JOINT_SET,
+    DEFAULT_PROFILE,
+    DETECTOR_BACKEND,
+    INFERENCE_PROFILES,
+    JOINT_SETS,
+    MAX_INFERENCE_SIDE,
+    POSE_OPTIONS,
+    AnalysisCancelled,
+    LandmarkBuffer,
+    LandmarkSequence,
+    VideoInfo,
+    iter_video_scores,
+    landmark_array_to_sequence,
+    landmark_rows_to_sequence,
+    load_pose_landmarker,
+    load_reference_pose,
+    process_video,
+    read_video_info,
+    score_all_poses,
+    score_landmark_sequence,
+)
+from backend.result_cache import LandmarkCache, ResultCache, landmark_key, result_key
+from backend.streaming import (
+    SSE_HEADERS,
+    SSE_KEEPALIVE,
+    STREAM_KEEPALIVE_S,
+    ScoreBatcher,
+    format_sse,
+)
+from backend.tracing import TRACE_DIR, new_tracer, save_trace
+from backend.uploads import SpooledUpload, read_body, spool_multipart
+from backend.wire import (
+    LANDMARKS_TAG,
+    MEDIA_TYPE,
+    LandmarkStreamEncoder,
+    WireFormatError,
+    decode_landmarks,
+    encode_result,
+    landmark_frame_count,
+    negotiated_score_dtype,
+    pack,
+    parse_media_type,
+    unpack,
+)
+from pose_utils import classify_pose_refined
+
+# Longest landmark sequence /api/score/landmarks accepts (an hour at 30 fps).
+MAX_LANDMARK_FRAMES = int(os.environ.get("POSE_MAX_LANDMARK_FRAMES", 108000))
+# Largest /api/score/landmarks body; an hour of JSON landmarks is about this size.
+MAX_LANDMARK_BODY_BYTES = (
+    int(os.environ.get("POSE_MAX_LANDMARK_BODY_MB", 256)) * 1024 * 1024
+)
+
 
-from backend.pose_scoring import POSE_OPTIONS, load_reference_pose, process_video
+def _register_state_metrics(state):
+    """Export counters kept by the admission controller and caches."""
 
-app = FastAPI(title="Yoga Pose Scoring API")
+    def cache_stats():
+        return [
+            (name, cache.stats())
+            for name, cache in (
+                ("results", state.result_cache),
+                ("landmarks", state.landmark_cache),
+            )
+        ]
+
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "pose_analyses_in_flight",
+            "Admitted analyses, running or waiting for a worker.",
+            "gauge",
+            lambda: [({}, state.admission.stats()["in_flight"])],
+        )
+    )
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "pose_analyses_rejected_total",
+            "Analyses turned away with 429 because the server was full.",
+            "counter",
+            lambda: [({}, state.admission.stats()["rejected"])],
+        )
+    )
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "pose_cache_hits_total",
+            "Cache lookups answered from memory or disk.",
+            "counter",
+            lambda: [
+                ({"cache": name, "level": level}, stats[f"{level}_hits"])
+                for name, stats in cache_stats()
+                for level in ("memory", "disk")
+            ],
+        )
+    )
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "pose_cache_misses_total",
+            "Cache lookups that found nothing.",
+            "counter",
+            lambda: [({"cache": name}, stats["misses"]) for name, stats in cache_stats()],
+        )
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the landmarker pools, job executor and worker processes before serving."""
+    pools = LandmarkerPools(POOL_SIZE)
+    pools.start()
+    app.state.landmarker_pools = pools
+    app.state.jobs = JobManager(JOB_WORKERS)
+    app.state.admission = AdmissionController(max_active=JOB_WORKERS)
+    app.state.result_cache = ResultCache()
+    app.state.landmark_cache = LandmarkCache()
+    app.state.live_slots = threading.BoundedSemaphore(LIVE_MAX_SESSIONS)
+    app.state.parallel = (
+        ParallelAnalyzer(PROCESS_WORKERS) if PROCESS_WORKERS > 0 else None
+    )
+    _register_state_metrics(app.state)
+    try:
+        yield
+    finally:
+        app.state.jobs.shutdown()
+        if app.state.parallel is not None:
+            app.state.parallel.close()
+        pools.close()
+
+
+app = FastAPI(title="Yoga Pose Scoring API", lifespan=lifespan)
 
 # CORS — allow the React frontend dev server
 app.add_middleware(
@@ -23,48 +170,878 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(LandmarkerUnavailable)
+async def landmarker_unavailable(request: Request, exc: LandmarkerUnavailable):
+    """Every landmarker stayed busy, or failed to rebuild, for the checkout timeout."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+class AnalysisRequest(NamedTuple):
+    """Validated analysis options shared by /api/analyze and /api/jobs."""
+
+    pose_names: list[str]
+    multi_pose: bool
+    parallel: bool
+    stride: int
+    target_fps: float | None
+    max_side: int | None
+    profile: str
+    joint_set: str
+
+    @property
+    def joints(self) -> list[str]:
+        return JOINT_SETS[self.joint_set]
+
+    @property
+    def label(self) -> str:
+        """Pose name, or the list of poses in multi-pose mode."""
+        if self.multi_pose:
+            return json.dumps(self.pose_names)
+        return self.pose_names[0]
+
+    @property
+    def extraction(self) -> str:
+        """Frame sampling and scaling settings, as used in cache keys."""
+        settings = []
+        if self.target_fps is not None:
+            settings.append(f"fps={self.target_fps:g}")
+        elif self.stride > 1:
+            settings.append(f"stride={self.stride}")
+        if self.max_side is not None:
+            settings.append(f"max_side={self.max_side}")
+        return ",".join(settings) or "default"
+
+
+def _resolve_pose_names(
+    pose_name: str | None, all_poses: bool, poses: list[str] | None
+) -> list[str]:
+    """The poses to score: one pose_name, or every pose (or `poses`) with all_poses."""
+    if all_poses:
+        pose_names = poses or list(POSE_OPTIONS.keys())
+    elif pose_name is not None:
+        pose_names = [pose_name]
+    else:
+        raise HTTPException(
+            status_code=400, detail="Provide pose_name or set all_poses=true"
+        )
+
+    for name in pose_names:
+        if name not in POSE_OPTIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown pose: {name}. Available: {list(POSE_OPTIONS.keys())}",
+            )
+    return pose_names
+
+
+def _check_joint_set(joint_set: str):
+    if joint_set not in JOINT_SETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown joint_set: {joint_set}. Available: {list(JOINT_SETS)}",
+        )
+
+
+class AnalysisForm(BaseModel):
+    """Form fields sent with an uploaded video."""
+
+    pose_name: str | None = None
+    all_poses: bool = False
+    poses: list[str] | None = None
+    parallel: bool = False
+    stride: int = 1
+    target_fps: float | None = None
+    max_side: int | None = MAX_INFERENCE_SIDE
+    profile: str = DEFAULT_PROFILE
+    joint_set: str = DEFAULT_JOINT_SET
+
+
+def analysis_request(fields: dict[str, list[str]]) -> AnalysisRequest:
+    """Parse the analysis form fields.
+
+    Either pose_name scores one pose, or all_poses=true scores every pose
+    (or the subset given as repeated `poses` fields) from a single pass.
+    stride or target_fps infer only a subset of frames and interpolate the rest.
+    max_side caps the frame size fed to the landmarker, profile picks one
+    of INFERENCE_PROFILES and joint_set one of JOINT_SETS.
+    """
+    # Like FastAPI's Form(), an empty field counts as not sent and a
+    # repeated one keeps its last value (every value for `poses`).
+    values = {
+        name: field_values if name == "poses" else field_values[-1]
+        for name, field_values in fields.items()
+        if name in AnalysisForm.model_fields and field_values[-1] != ""
+    }
+    try:
+        form = AnalysisForm.model_validate(values)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    pose_names = _resolve_pose_names(form.pose_name, form.all_poses, form.poses)
+    _check_joint_set(form.joint_set)
+    if form.profile not in INFERENCE_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown profile: {form.profile}. Available: {list(INFERENCE_PROFILES)}",
+        )
+    if form.parallel and app.state.parallel is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Parallel analysis is disabled (set POSE_PROCESS_WORKERS)",
+        )
+    if form.parallel and form.profile != app.state.parallel.profile:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Parallel analysis only runs the {app.state.parallel.profile} profile",
+        )
+    if form.parallel and form.all_poses:
+        raise HTTPException(
+            status_code=400, detail="all_poses does not support parallel=true"
+        )
+    if (
+        form.stride < 1
+        or (form.target_fps is not None and form.target_fps <= 0)
+        or (form.max_side is not None and form.max_side <= 0)
+    ):
+        raise HTTPException(
+            status_code=400, detail="stride, target_fps and max_side must be positive"
+        )
+    if form.parallel and (form.stride > 1 or form.target_fps is not None):
+        raise HTTPException(
+            status_code=400, detail="Frame sampling does not support parallel=true"
+        )
+
+    return AnalysisRequest(
+        pose_names,
+        form.all_poses,
+        form.parallel,
+        form.stride,
+        form.target_fps,
+        form.max_side,
+        form.profile,
+        form.joint_set,
+    )
+
+
+def _remove_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _score_stats(scores) -> dict:
+    scores_list = [float(s) for s in scores]
+
+    return {
+        "scores": scores_list,
+        "avg_score": float(np.mean(scores_list)) if scores_list else 0.0,
+        "max_score": float(np.max(scores_list)) if scores_list else 0.0,
+        "min_score": float(np.min(scores_list)) if scores_list else 0.0,
+    }
+
+
+def _summarize_scores(scores, fps: float) -> dict:
+    return {
+        **_score_stats(scores),
+        "fps": float(fps),
+        "total_frames": len(scores),
+    }
+
+
+def _sampling_info(frame_indices, total_frames: int) -> dict:
+    """Which frames were inferred, when sampling skipped some of them."""
+    if len(frame_indices) == total_frames:
+        return {}
+    return {"inferred_frames": [int(i) for i in frame_indices]}
+
+
+def _summarize_pose_matrix(scores: np.ndarray, pose_names: list[str], fps: float) -> dict:
+    """Per-pose timelines plus the best matching pose for each frame."""
+    best = np.argmax(scores, axis=1) if len(pose_names) else []
+    best_pose = [
+        pose_names[b] if scores[i, b] > 0.0 else None for i, b in enumerate(best)
+    ]
+
+    return {
+        "fps": float(fps),
+        "total_frames": int(scores.shape[0]),
+        "poses": {
+            name: _score_stats(scores[:, p]) for p, name in enumerate(pose_names)
+        },
+        "best_pose": best_pose,
+    }
+
+
+def _respond(result: dict, accept: str | None) -> Response:
+    """Return a result as JSON, or in the binary wire format if the client asked."""
+    score_dtype = negotiated_score_dtype(accept)
+    with metrics.SERIALIZE_SECONDS.time():
+        if score_dtype is None:
+            return JSONResponse(result)
+        return Response(encode_result(result, score_dtype), media_type=MEDIA_TYPE)
+
+
+def _cached_result(upload: SpooledUpload, request: AnalysisRequest) -> dict | None:
+    """Return a cached result for this upload, removing its temp file on a hit."""
+    cached = app.state.result_cache.get(
+        result_key(
+            upload.sha256,
+            request.label,
+            profile=request.profile,
+            extraction=request.extraction,
+            joint_set=request.joint_set,
+        )
+    )
+    if cached is None:
+        return None
+    _remove_file(upload.path)
+    return {**cached, "cached": True}
+
+
+class AdmittedUpload(NamedTuple):
+    """An admitted upload, with either a cached result or its probed metadata."""
+
+    request: AnalysisRequest
+    upload: SpooledUpload
+    admission: Admission | None
+    cached: dict | None
+    info: VideoInfo | None
+
+
+async def _admit_upload(
+    http_request: Request, check: Callable[[AnalysisRequest], None] | None = None
+) -> AdmittedUpload:
+    """Receive an upload, look it up in the result cache and admit its analysis.
+
+    The body is a multipart form with the video in a `video` file field and
+    the fields analysis_request parses; check may reject the parsed request
+    with an HTTPException. Raises 413 as soon as the upload passes its
+    limit, 429 when the server is at capacity and 4xx when the pre-flight
+    probe rejects the video. Cache hits run no analysis, so they are
+    answered without taking an admission (admission is None); otherwise
+    the admission is released when the analysis job finishes.
+    """
+    with metrics.UPLOAD_SECONDS.time():
+        form = await spool_multipart(http_request)
+    upload = form.upload
+    try:
+        request = analysis_request(form.fields)
+        if check is not None:
+            check(request)
+    except HTTPException:
+        _remove_file(upload.path)
+        raise
+
+    # The result cache reads from disk; keep it off the event loop.
+    cached = await run_in_threadpool(_cached_result, upload, request)
+    if cached is not None:
+        return AdmittedUpload(request, upload, None, cached, None)
+
+    try:
+        admission = app.state.admission.admit()
+    except HTTPException:
+        _remove_file(upload.path)
+        raise
+    try:
+        info = await run_in_threadpool(read_video_info, upload.path)
+        try:
+            check_video_limits(info)
+        except HTTPException:
+            _remove_file(upload.path)
+            raise
+        return AdmittedUpload(request, upload, admission, None, info)
+    except BaseException:
+        admission.release(analyzed=False)
+        raise
+
+
+def _finish_job(video_path: str, admission: Admission):
+    _remove_file(video_path)
+    admission.release()
+
+
+def _submit_analysis(
+    upload: SpooledUpload, request: AnalysisRequest, admission: Admission
+):
+    """Queue an analysis job; the temp video and admission are released when it finishes."""
+    video_path = upload.path
+    cache_key = result_key(
+        upload.sha256,
+        request.label,
+        profile=request.profile,
+        extraction=request.extraction,
+        joint_set=request.joint_set,
+    )
+    landmarks_key = landmark_key(
+        upload.sha256, profile=request.profile, extraction=request.extraction
+    )
+
+    def work(job):
+        tracer = new_tracer(f"analysis {job.id}")
+        if request.multi_pose:
+            result = analyze_all(job, tracer)
+        else:
+            result = analyze(job, tracer)
+        app.state.result_cache.put(cache_key, result)
+
+        # Added after caching: the trace describes this run only.
+        trace = save_trace(tracer, job.id)
+        if trace is not None:
+            result = {**result, "trace": trace}
+        return result
+
+    def extract(job, tracer):
+        """Landmarks for the video, from the cache or a fresh extraction."""
+        sequence = app.state.landmark_cache.get(landmarks_key)
+        if sequence is not None:
+            return sequence
+
+        buffer = LandmarkBuffer()
+        with app.state.landmarker_pools.checkout(request.profile) as landmarker:
+            _, fps = process_video(
+                video_path,
+                None,
+                landmarker,
+                progress_callback=job.update_progress,
+                cancel_event=job.cancel_event,
+                landmark_buffer=buffer,
+                stride=request.stride,
+                target_fps=request.target_fps,
+                max_side=request.max_side,
+                tracer=tracer,
+            )
+        sequence = buffer.to_sequence(fps)
+        app.state.landmark_cache.put(landmarks_key, sequence)
+        return sequence
+
+    def analyze_all(job, tracer):
+        sequence = extract(job, tracer)
+        with metrics.BATCH_SCORE_SECONDS.time(), tracer.span("score_all_poses"):
+            scores = score_all_poses(sequence, request.pose_names, request.joints)
+        result = _summarize_pose_matrix(scores, request.pose_names, sequence.fps)
+        result.update(_sampling_info(sequence.frame_indices, sequence.total_frames))
+        return result
+
+    def analyze(job, tracer):
+        reference_angles = load_reference_pose(request.pose_names[0])
+
+        # Landmarks from an earlier run against another pose: score only.
+        sequence = app.state.landmark_cache.get(landmarks_key)
+        if sequence is not None:
+            with metrics.BATCH_SCORE_SECONDS.time():
+                scores = score_landmark_sequence(
+                    sequence, reference_angles, request.joints
+                )
+            result = _summarize_scores(scores, sequence.fps)
+            result.update(
+                _sampling_info(sequence.frame_indices, sequence.total_frames)
+            )
+            return result
+
+        if request.parallel:
+            scores, fps = app.state.parallel.process_video(
+                video_path,
+                reference_angles,
+                progress_callback=job.update_progress,
+                cancel_event=job.cancel_event,
+                max_side=request.max_side,
+                joints=request.joints,
+            )
+            return _summarize_scores(scores, fps)
+
+        stage_stats = {}
+        buffer = LandmarkBuffer()
+        with app.state.landmarker_pools.checkout(request.profile) as landmarker:
+            scores, fps = process_video(
+                video_path,
+                reference_angles,
+                landmarker,
+                progress_callback=job.update_progress,
+                cancel_event=job.cancel_event,
+                stage_stats=stage_stats,
+                landmark_buffer=buffer,
+                stride=request.stride,
+                target_fps=request.target_fps,
+                max_side=request.max_side,
+                joints=request.joints,
+                tracer=tracer,
+            )
+        app.state.landmark_cache.put(landmarks_key, buffer.to_sequence(fps))
+        result = _summarize_scores(scores, fps)
+        result.update(_sampling_info(buffer.frame_indices, buffer.total_frames))
+        result["stage_timings"] = {
+            name: stats.to_dict() for name, stats in stage_stats.items()
+        }
+        return result
+
+    return app.state.jobs.submit(
+        request.label, work, cleanup=lambda: _finish_job(video_path, admission)
+    )
+
+
+def _submit_stream(
+    upload: SpooledUpload,
+    request: AnalysisRequest,
+    info: VideoInfo,
+    admission: Admission,
+    emit,
+):
+    """Queue a single-pose analysis that emits score batches as it runs.
+
+    emit(event, data) is called from the worker thread.
+    """
+    video_path = upload.path
+    cache_key = result_key(
+        upload.sha256,
+        request.label,
+        profile=request.profile,
+        extraction=request.extraction,
+        joint_set=request.joint_set,
+    )
+    landmarks_key = landmark_key(
+        upload.sha256, profile=request.profile, extraction=request.extraction
+    )
+
+    def work(job):
+        reference_angles = load_reference_pose(request.pose_names[0])
+
+        # Results match /api/analyze, sampling info included, since they
+        # are cached under the same key.
+        sequence = app.state.landmark_cache.get(landmarks_key)
+        if sequence is not None:
+            with metrics.BATCH_SCORE_SECONDS.time():
+                scores = score_landmark_sequence(
+                    sequence, reference_angles, request.joints
+                )
+            batcher = ScoreBatcher(emit, len(scores))
+            batcher.scores.extend(scores)
+            batcher.flush()
+            result = _summarize_scores(scores, sequence.fps)
+            result.update(
+                _sampling_info(sequence.frame_indices, sequence.total_frames)
+            )
+            app.state.result_cache.put(cache_key, result)
+            return result
+
+        batcher = ScoreBatcher(emit, info.total_frames)
+        inferred_frames = []
+        with app.state.landmarker_pools.checkout(request.profile) as landmarker:
+            frames = iter_video_scores(
+                video_path,
+                reference_angles,
+                landmarker,
+                stride=request.stride,
+                target_fps=request.target_fps,
+                max_side=request.max_side,
+                joints=request.joints,
+            )
+            try:
+                for frame in frames:
+                    if job.cancel_event.is_set():
+                        raise AnalysisCancelled(video_path)
+                    batcher.add(frame.score)
+                    if frame.inferred:
+                        inferred_frames.append(frame.frame_index)
+                    job.update_progress(len(batcher.scores), info.total_frames)
+            finally:
+                frames.close()
+        batcher.flush()
+
+        result = _summarize_scores(batcher.scores, info.fps)
+        result.update(_sampling_info(inferred_frames, len(batcher.scores)))
+        app.state.result_cache.put(cache_key, result)
+        return result
+
+    return app.state.jobs.submit(
+        request.label, work, cleanup=lambda: _finish_job(video_path, admission)
+    )
+
+
 @app.get("/api/poses")
 def get_poses():
     """Return available pose options."""
     return {"poses": list(POSE_OPTIONS.keys())}
 
 
+@app.get("/api/profiles")
+def get_profiles():
+    """Return available inference profiles, the default and the detector backend."""
+    return {
+        "default": DEFAULT_PROFILE,
+        "detector": DETECTOR_BACKEND,
+        "profiles": {
+            name: {
+                "model_asset": profile.model_asset,
+                "running_mode": profile.running_mode.name,
+                "output_segmentation_masks": profile.output_segmentation_masks,
+            }
+            for name, profile in INFERENCE_PROFILES.items()
+        },
+    }
+
+
 @app.post("/api/analyze")
-async def analyze_video(
-    video: UploadFile = File(...),
-    pose_name: str = Form(...),
-):
-    """Analyze an uploaded video against a reference pose."""
-    if pose_name not in POSE_OPTIONS:
+async def analyze_video(http_request: Request):
+    """Analyze an uploaded video against a reference pose.
+
+    The body is a multipart form: the video and the analysis_request fields.
+
+    parallel=true splits the video across worker processes. all_poses=true
+    returns a timeline per pose and the best matching pose for each frame.
+    Clients that accept wire.MEDIA_TYPE get the result in that encoding.
+    """
+    accept = http_request.headers.get("accept")
+    admitted = await _admit_upload(http_request)
+    if admitted.cached is not None:
+        return _respond(admitted.cached, accept)
+
+    job = _submit_analysis(admitted.upload, admitted.request, admitted.admission)
+
+    # Wait on the worker thread without blocking the event loop.
+    result = await asyncio.wrap_future(job.future)
+    if result is None:
+        raise HTTPException(status_code=409, detail="Analysis was cancelled")
+    return _respond(result, accept)
+
+
+def _check_streamable(request: AnalysisRequest):
+    if request.multi_pose or request.parallel:
         raise HTTPException(
             status_code=400,
-            detail=f"Unknown pose: {pose_name}. Available: {list(POSE_OPTIONS.keys())}",
+            detail="Streaming supports single-pose serial analysis only",
         )
 
-    # Save uploaded video to a temp file
-    suffix = os.path.splitext(video.filename or "video.mp4")[1] or ".mp4"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        content = await video.read()
-        tmp.write(content)
-        tmp_path = tmp.name
 
+@app.post("/api/analyze/stream")
+async def analyze_video_stream(http_request: Request):
+    """Analyze a video, streaming progress and scores as Server-Sent Events.
+
+    Events: `start` (job id, fps, total_frames), `scores` (a batch of
+    per-frame scores starting at frame `start`, with frames_done,
+    processing_fps and eta_s), then one of `result` (the same body as
+    /api/analyze), `cancelled` or `error`. Disconnecting cancels the job.
+    """
+    admitted = await _admit_upload(http_request, _check_streamable)
+    if admitted.cached is not None:
+        return StreamingResponse(
+            iter([format_sse("result", admitted.cached)]),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def emit(event, data):
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+    # Submitted here rather than in events() so the admission is released
+    # by the job even if the response never starts streaming.
+    info = admitted.info
+    job = _submit_stream(
+        admitted.upload, admitted.request, info, admitted.admission, emit
+    )
+    job.future.add_done_callback(lambda _: emit(None, None))
+
+    async def events():
+        try:
+            yield format_sse(
+                "start",
+                {"job_id": job.id, "fps": info.fps, "total_frames": info.total_frames},
+            )
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(
+                        queue.get(), timeout=STREAM_KEEPALIVE_S
+                    )
+                except asyncio.TimeoutError:
+                    yield SSE_KEEPALIVE
+                    continue
+                if event is None:
+                    break
+                yield format_sse(event, data)
+
+            if job.status == JobStatus.DONE:
+                yield format_sse("result", job.result)
+            elif job.status == JobStatus.FAILED:
+                yield format_sse("error", {"detail": job.error})
+            else:
+                yield format_sse("cancelled", {"job_id": job.id})
+        finally:
+            # Client went away mid-stream: stop the analysis too.
+            if not job.future.done():
+                app.state.jobs.cancel(job.id)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+class LandmarkScoreRequest(BaseModel):
+    """Body of /api/score/landmarks.
+
+    landmarks holds one entry per video frame: None when no pose was
+    detected, otherwise 33 rows of [x, y] (z and visibility may follow).
+    In the binary wire format these options are the message header and
+    the landmarks an LMKS section instead.
+    """
+
+    landmarks: list[list[list[float]] | None] = []
+    fps: float = 30.0
+    pose_name: str | None = None
+    all_poses: bool = False
+    poses: list[str] | None = None
+    joint_set: str = DEFAULT_JOINT_SET
+    classify: bool = True
+
+
+def _parse_landmark_request(
+    body: bytes, content_type: str | None
+) -> tuple[LandmarkScoreRequest, LandmarkSequence]:
+    """Parse a JSON or wire-format /api/score/landmarks body."""
     try:
-        reference_angles = load_reference_pose(pose_name)
-        scores, fps = process_video(tmp_path, reference_angles)
-
-        scores_list = [float(s) for s in scores]
-
-        return {
-            "scores": scores_list,
-            "fps": float(fps),
-            "total_frames": len(scores_list),
-            "avg_score": float(np.mean(scores_list)) if scores_list else 0.0,
-            "max_score": float(np.max(scores_list)) if scores_list else 0.0,
-            "min_score": float(np.min(scores_list)) if scores_list else 0.0,
-        }
-    finally:
-        # Cleanup temp file
+        if parse_media_type(content_type) is None:
+            request = LandmarkScoreRequest.model_validate_json(body)
+            frames, landmarks, valid = len(request.landmarks), None, None
+        else:
+            header, sections = unpack(body)
+            request = LandmarkScoreRequest.model_validate(header)
+            payloads = [payload for tag, payload in sections if tag == LANDMARKS_TAG]
+            if len(payloads) != 1:
+                raise WireFormatError("Expected exactly one LMKS section")
+            # Checked from the header, before anything sized by it is decoded.
+            frames = landmark_frame_count(payloads[0])
+            if frames <= MAX_LANDMARK_FRAMES:
+                landmarks, valid = decode_landmarks(
+                    payloads[0], max_frames=MAX_LANDMARK_FRAMES
+                )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    except WireFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if frames > MAX_LANDMARK_FRAMES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_LANDMARK_FRAMES} frames can be scored per request",
+        )
+    if request.fps <= 0:
+        raise HTTPException(status_code=400, detail="fps must be positive")
+
+    try:
+        if landmarks is None:
+            sequence = landmark_rows_to_sequence(request.landmarks, request.fps)
+        else:
+            sequence = landmark_array_to_sequence(landmarks, valid, request.fps)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return request, sequence
+
+
+@app.post("/api/score/landmarks")
+async def score_landmarks(http_request: Request):
+    """Score landmarks a client already extracted, with no upload or inference.
+
+    The body is a LandmarkScoreRequest as JSON, or the same in the
+    wire.MEDIA_TYPE encoding. Returns the same summary as /api/analyze
+    (per-pose timelines with all_poses=true), plus each frame's classified
+    pose when classify=true.
+    """
+    body = await read_body(http_request, MAX_LANDMARK_BODY_BYTES)
+    request, sequence = _parse_landmark_request(
+        body, http_request.headers.get("content-type")
+    )
+    pose_names = _resolve_pose_names(
+        request.pose_name, request.all_poses, request.poses
+    )
+    _check_joint_set(request.joint_set)
+
+    result = await run_in_threadpool(
+        _score_landmark_sequence, request, sequence, pose_names
+    )
+    return _respond(result, http_request.headers.get("accept"))
+
+
+def _score_landmark_sequence(
+    request: LandmarkScoreRequest, sequence: LandmarkSequence, pose_names: list[str]
+) -> dict:
+    joints = JOINT_SETS[request.joint_set]
+    if request.all_poses:
+        with metrics.BATCH_SCORE_SECONDS.time():
+            scores = score_all_poses(sequence, pose_names, joints)
+        result = _summarize_pose_matrix(scores, pose_names, sequence.fps)
+    else:
+        reference_angles = load_reference_pose(pose_names[0])
+        with metrics.BATCH_SCORE_SECONDS.time():
+            scores = score_landmark_sequence(sequence, reference_angles, joints)
+        result = _summarize_scores(scores, sequence.fps)
+
+    if request.classify:
+        result["classifications"] = [
+            classify_pose_refined(frame[:, :2]) if valid else None
+            for frame, valid in zip(sequence.landmarks, sequence.valid)
+        ]
+    return result
+
+
+@app.websocket("/api/live")
+async def live_scoring(
+    websocket: WebSocket,
+    pose_name: str | None = None,
+    profile: str = DEFAULT_PROFILE,
+    joint_set: str = DEFAULT_JOINT_SET,
+    max_side: int | None = MAX_INFERENCE_SIDE,
+    encoding: str = "json",
+):
+    """Score webcam frames sent as binary WebSocket messages.
+
+    Each message is a JPEG, a PNG or a raw frame (see live.RAW_FRAME_HEADER).
+    Every processed frame gets a JSON reply with its landmarks, the
+    classified pose and, if pose_name is given, its score against that
+    pose. Frames that arrive while another is being processed are dropped
+    in favour of the newest; replies report the running `dropped` count.
+    With encoding=binary, replies are wire-format messages whose landmarks
+    are delta-encoded against the previous reply's.
+    """
+    await websocket.accept()
+
+    if pose_name is not None and pose_name not in POSE_OPTIONS:
+        await websocket.close(code=1008, reason=f"Unknown pose: {pose_name}")
+        return
+    if profile not in INFERENCE_PROFILES:
+        await websocket.close(code=1008, reason=f"Unknown profile: {profile}")
+        return
+    if joint_set not in JOINT_SETS:
+        await websocket.close(code=1008, reason=f"Unknown joint_set: {joint_set}")
+        return
+    if encoding not in ("json", "binary"):
+        await websocket.close(code=1008, reason=f"Unknown encoding: {encoding}")
+        return
+    if not app.state.live_slots.acquire(blocking=False):
+        await websocket.close(code=1013, reason="Too many live sessions")
+        return
+
+    try:
+        landmarker = await run_in_threadpool(load_pose_landmarker, profile)
+        session = LiveSession(
+            landmarker,
+            load_reference_pose(pose_name) if pose_name is not None else None,
+            JOINT_SETS[joint_set],
+            max_side,
+        )
+        frames = LatestFrame()
+        landmark_encoder = LandmarkStreamEncoder()
+
+        async def receive():
+            frame_id = 0
+            try:
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    if message.get("bytes") is not None:
+                        frames.put((frame_id, time.perf_counter(), message["bytes"]))
+                        frame_id += 1
+            finally:
+                frames.close()
+
+        receiver = asyncio.create_task(receive())
         try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+            while (item := await frames.get()) is not None:
+                frame_id, received_at, payload = item
+                try:
+                    result = await run_in_threadpool(session.process, payload)
+                except FrameError as e:
+                    await websocket.send_json(
+                        {"type": "error", "frame": frame_id, "detail": str(e)}
+                    )
+                    continue
+                landmarks = result.pop("landmarks")
+                reply = {
+                    "type": "result",
+                    "frame": frame_id,
+                    **result,
+                    "latency_ms": round((time.perf_counter() - received_at) * 1000, 1),
+                    "dropped": frames.dropped,
+                }
+                if encoding == "binary":
+                    await websocket.send_bytes(
+                        pack(reply, [(LANDMARKS_TAG, landmark_encoder.encode(landmarks))])
+                    )
+                else:
+                    reply["landmarks"] = (
+                        None if landmarks is None else np.round(landmarks, 5).tolist()
+                    )
+                    await websocket.send_json(reply)
+        finally:
+            receiver.cancel()
+            await run_in_threadpool(session.close)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        app.state.live_slots.release()
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(http_request: Request):
+    """Queue an analysis and return its job id immediately."""
+    admitted = await _admit_upload(http_request)
+    if admitted.cached is not None:
+        job = app.state.jobs.add_completed(admitted.request.label, admitted.cached)
+    else:
+        job = _submit_analysis(admitted.upload, admitted.request, admitted.admission)
+    return {"job_id": job.id, "status": job.status.value}
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    """Return a job's status, progress and (once done) result."""
+    job = app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
+
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = app.state.jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Return stage latency histograms and counters in Prometheus text format."""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/api/traces/{name}")
+def get_trace(name: str):
+    """Download a Chrome trace-event file written for an analysis.
+
+    Traces are only written when POSE_TRACE_DIR is set; the result of a
+    traced analysis names its file in `trace`.
+    """
+    if TRACE_DIR is None:
+        raise HTTPException(status_code=404, detail="Tracing is disabled")
+    path = os.path.join(TRACE_DIR, os.path.basename(name))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"Unknown trace: {name}")
+    return FileResponse(path, media_type="application/json")
+
+
+@app.get("/api/admission/stats")
+def admission_stats():
+    """Return in-flight analyses, capacity and rejected request counts."""
+    return app.state.admission.stats()
+
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    """Return result and landmark cache hit/miss counters."""
+    return {
+        "results": app.state.result_cache.stats(),
+        "landmarks": app.state.landmark_cache.stats(),
+    }
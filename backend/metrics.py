@@ -0,0 +1,254 @@
+"""
+Process-wide metrics in the Prometheus text exposition format.
+Counters and histograms are updated where the work happens; values owned
+by other objects (cache counters, in-flight analyses) are read through
+callbacks when /metrics is scraped. Worker processes used for parallel
+analysis keep their own counters, which are not reported here.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# ================================
+# Configuration
+# ================================
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds. Per-frame stages take from tens of microseconds
+# (scoring) to tens of milliseconds (heavy-model inference).
+FRAME_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 1.0,
+)
+# Whole-request stages: uploads, batch scoring and response serialization.
+REQUEST_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# ================================
+# Metric Types
+# ================================
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._children = {}
+        self._lock = threading.Lock()
+        if not labelnames:
+            # Unlabelled metrics are exported as zero before their first update.
+            self._children[()] = self._new_child()
+
+    def labels(self, **labels):
+        """The child for one combination of label values."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self):
+        """(suffix, labels, value) for every exported sample."""
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+            )
+        return lines
+
+    def _items(self):
+        with self._lock:
+            items = list(self._children.items())
+        for key, child in items:
+            yield dict(zip(self.labelnames, key)), child
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for labels, child in self._items():
+            yield "", labels, child.value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple[float, ...]):
+        self._buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = REQUEST_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _samples(self):
+        for labels, child in self._items():
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose samples come from fn() at scrape time.
+
+    fn returns an iterable of (labels, value) pairs.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, fn):
+        super().__init__(name, help)
+        self.kind = kind
+        self._fn = fn
+
+    def _new_child(self):
+        return None
+
+    def _samples(self):
+        for labels, value in self._fn():
+            yield "", labels, value
+
+
+class Registry:
+    """Named metrics, rendered together for a scrape."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric, replacing any earlier one with the same name."""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ================================
+# Metrics
+# ================================
+
+REGISTRY = Registry()
+
+FRAME_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "pose_frame_stage_seconds",
+        "Time per frame in each stage: decode, color_convert (resize and "
+        "BGR to RGB), detect (detect_for_video), score.",
+        ("stage",),
+        FRAME_BUCKETS,
+    )
+)
+REQUEST_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "pose_request_stage_seconds",
+        "Time per request in each stage: upload, score (batch), serialize.",
+        ("stage",),
+        REQUEST_BUCKETS,
+    )
+)
+FRAMES_PROCESSED = REGISTRY.register(
+    Counter("pose_frames_processed_total", "Frames run through the landmarker.")
+)
+FRAMES_WITHOUT_DETECTION = REGISTRY.register(
+    Counter(
+        "pose_frames_without_detection_total",
+        "Frames in which the landmarker found no pose.",
+    )
+)
+
+# Children looked up once, since some are updated for every frame.
+DECODE_SECONDS = FRAME_STAGE_SECONDS.labels(stage="decode")
+COLOR_CONVERT_SECONDS = FRAME_STAGE_SECONDS.labels(stage="color_convert")
+DETECT_SECONDS = FRAME_STAGE_SECONDS.labels(stage="detect")
+SCORE_SECONDS = FRAME_STAGE_SECONDS.labels(stage="score")
+UPLOAD_SECONDS = REQUEST_STAGE_SECONDS.labels(stage="upload")
+BATCH_SCORE_SECONDS = REQUEST_STAGE_SECONDS.labels(stage="score")
+SERIALIZE_SECONDS = REQUEST_STAGE_SECONDS.labels(stage="serialize")
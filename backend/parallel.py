@@ -0,0 +1,278 @@
+"""
+Multi-process video analysis.
+A video is split into time segments that are scored in parallel worker
+processes, each with its own landmarker, then stitched back together.
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import cv2
+
+from backend.pose_scoring import (
+    DEFAULT_PROFILE,
+    AnalysisCancelled,
+    LandmarkBuffer,
+    MAX_INFERENCE_SIDE,
+    SCORED_JOINTS,
+    detect_landmarks,
+    load_pose_landmarker,
+    prepare_frame,
+    score_landmark_sequence,
+)
+
+# ================================
+# Configuration
+# ================================
+
+# Worker processes for parallel analysis; 0 disables the mode.
+PROCESS_WORKERS = int(os.environ.get("POSE_PROCESS_WORKERS", 0))
+
+# Shorter segments spend more time on seeking and warm-up than they save.
+MIN_SEGMENT_FRAMES = 150
+
+# Frames decoded before each segment (and then discarded) so VIDEO-mode
+# tracking has settled by the first frame that is actually scored.
+SEGMENT_WARMUP_FRAMES = 15
+
+# Largest per-frame difference from serial process_video, in score points.
+# Measured on the replay detector, whose landmarks depend only on frame
+# timestamps: the max |diff| was 0.0 over 457 frames in 3 segments
+# (tests/test_parallel.py), so the bound only allows float rounding. A
+# score that lands on a neighbouring frame is off by several points, since
+# 0.001 of landmark jitter alone moves scores by up to 5.7. The bound
+# therefore catches seeking and stitching errors. It does not cover the
+# tracking restarts MediaPipe makes at segment boundaries; bench_parallel
+# reports those separately.
+PARALLEL_SCORE_TOLERANCE = 1e-6
+
+# Frames a worker scores between checks of the video's cancel flag, which
+# is a round trip to the manager process.
+CANCEL_CHECK_FRAMES = 10
+
+# ================================
+# Worker Process
+# ================================
+
+_worker_profile = DEFAULT_PROFILE
+
+
+def _init_worker(profile: str):
+    """Remember the inference profile this process builds landmarkers for."""
+    global _worker_profile
+    _worker_profile = profile
+
+
+def _open_at(video_path: str, frame_index: int, fps: float) -> cv2.VideoCapture:
+    """Open a video so that the next read() returns frame frame_index.
+
+    CAP_PROP_POS_FRAMES seeks are not exact for every file, so the seek
+    lands one frame early and that frame's timestamp is checked. If it is
+    not where the frame should be, the video is reopened and grabbed,
+    without converting frames, from the start.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if frame_index == 0:
+        return cap
+
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index - 1)
+    expected_ms = (frame_index - 1) * 1000 / fps
+    if cap.grab() and abs(cap.get(cv2.CAP_PROP_POS_MSEC) - expected_ms) < 500 / fps:
+        return cap
+
+    cap.release()
+    cap = cv2.VideoCapture(video_path)
+    for _ in range(frame_index):
+        if not cap.grab():
+            break
+    return cap
+
+
+def _score_segment(
+    video_path: str,
+    start_frame: int,
+    end_frame: int | None,
+    fps: float,
+    reference_angles: dict,
+    max_side: int | None = MAX_INFERENCE_SIDE,
+    joints: list[str] = SCORED_JOINTS,
+    cancel_flag=None,
+) -> tuple[int, list[float]]:
+    """Score frames [start_frame, end_frame) of a video.
+
+    end_frame=None reads to the end of the file. Timestamps are the frames'
+    real positions in the video, so they stay monotonic within the segment.
+    Each segment gets a new landmarker, so its tracking starts from the
+    warm-up frames alone and not from whatever segment the worker ran last.
+    Setting cancel_flag, a Manager Event, aborts with AnalysisCancelled.
+    """
+    warmup_start = max(0, start_frame - SEGMENT_WARMUP_FRAMES)
+
+    landmarker = load_pose_landmarker(_worker_profile)
+    cap = _open_at(video_path, warmup_start, fps)
+
+    buffer = LandmarkBuffer()
+    frame_index = warmup_start
+
+    try:
+        while cap.isOpened() and (end_frame is None or frame_index < end_frame):
+            if (
+                cancel_flag is not None
+                and frame_index % CANCEL_CHECK_FRAMES == 0
+                and cancel_flag.is_set()
+            ):
+                raise AnalysisCancelled(video_path)
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            timestamp_ms = int((frame_index / fps) * 1000)
+            landmarks = detect_landmarks(
+                landmarker, prepare_frame(frame, max_side), timestamp_ms
+            )
+            if frame_index >= start_frame:
+                buffer.append(frame_index, landmarks)
+
+            frame_index += 1
+    finally:
+        cap.release()
+        landmarker.close()
+
+    sequence = buffer.to_sequence(fps)
+    return start_frame, score_landmark_sequence(sequence, reference_angles, joints)
+
+
+# ================================
+# Parallel Analyzer
+# ================================
+
+
+def split_segments(total_frames: int, workers: int) -> list[tuple[int, int | None]]:
+    """Split [0, total_frames) into at most `workers` contiguous segments.
+
+    The last segment is open-ended so frames beyond an under-reported
+    CAP_PROP_FRAME_COUNT are still scored.
+    """
+    count = max(1, min(workers, total_frames // MIN_SEGMENT_FRAMES))
+    size = math.ceil(total_frames / count) if total_frames > 0 else 0
+
+    segments = []
+    for i in range(count):
+        start = i * size
+        end = None if i == count - 1 else (i + 1) * size
+        segments.append((start, end))
+    return segments
+
+
+def stitch_segments(
+    segments: list[tuple[int, int | None]], segment_scores: dict[int, list[float]]
+) -> list[float]:
+    """Join per-segment scores, checking that they cover the video without gaps.
+
+    Every segment but the last must have scored exactly its frames; one that
+    stopped early (a failed read or a bad seek) would shift every later
+    score onto the wrong frame, so it raises RuntimeError instead.
+    """
+    scores_over_time = []
+    for start, end in segments:
+        scores = segment_scores[start]
+        if end is not None and len(scores) != end - start:
+            raise RuntimeError(
+                f"Segment [{start}, {end}) scored {len(scores)} frames, "
+                f"expected {end - start}"
+            )
+        scores_over_time.extend(scores)
+    return scores_over_time
+
+
+class ParallelAnalyzer:
+    """Persistent process pool that scores videos segment by segment.
+
+    Every worker builds landmarkers for one inference profile. A manager
+    process holds each video's cancel flag, so cancelling stops segments
+    that are already running and not only those still queued.
+    """
+
+    def __init__(self, workers: int = PROCESS_WORKERS, profile: str = DEFAULT_PROFILE):
+        if workers < 1:
+            raise ValueError(f"Need at least one worker process, got {workers}")
+        self.workers = workers
+        self.profile = profile
+        # spawn, not fork: the parent already runs MediaPipe and server threads.
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(profile,),
+        )
+        self._manager = multiprocessing.get_context("spawn").Manager()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._manager.shutdown()
+
+    def process_video(
+        self,
+        video_path: str,
+        reference_angles: dict,
+        progress_callback=None,
+        cancel_event=None,
+        max_side: int | None = MAX_INFERENCE_SIDE,
+        joints: list[str] = SCORED_JOINTS,
+    ) -> tuple[list[float], float]:
+        """Parallel counterpart of pose_scoring.process_video.
+
+        Scores can differ slightly from the serial path in the frames after
+        each segment boundary, where tracking restarts from the warm-up
+        frames; benchmarks/bench_parallel.py measures by how much. Without
+        tracking state they match within PARALLEL_SCORE_TOLERANCE.
+        Returns (scores_over_time, fps).
+        """
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        segments = split_segments(total_frames, self.workers)
+        cancel_flag = self._manager.Event()
+        futures = [
+            self._executor.submit(
+                _score_segment,
+                video_path,
+                start,
+                end,
+                fps,
+                reference_angles,
+                max_side,
+                joints,
+                cancel_flag,
+            )
+            for start, end in segments
+        ]
+
+        segment_scores = {}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise AnalysisCancelled(video_path)
+
+                for future in done:
+                    start, scores = future.result()
+                    segment_scores[start] = scores
+
+                if progress_callback is not None and done:
+                    frames_done = sum(len(s) for s in segment_scores.values())
+                    progress_callback(frames_done, total_frames)
+        finally:
+            if pending:
+                # Stops the running segments; queued ones never start.
+                cancel_flag.set()
+                for future in pending:
+                    future.cancel()
+
+        return stitch_segments(segments, segment_scores), fps
@@ -0,0 +1,101 @@
+"""
+Helpers for the staged decode / inference / scoring pipeline.
+Stages run on their own threads, linked by bounded queues, and record how
+long they spent working versus waiting on their neighbours.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# Marks the end of a stage's output; None is a real item (no detection).
+END = object()
+
+# How often a blocked stage wakes up to check whether the pipeline stopped.
+_POLL_INTERVAL_S = 0.1
+
+
+class StageStats:
+    """Busy and stalled wall-clock time for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.busy_s = 0.0
+        self.stalled_s = 0.0
+        self.items = 0
+
+    @contextmanager
+    def busy(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.busy_s += time.perf_counter() - start
+            self.items += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "busy_s": round(self.busy_s, 4),
+            "stalled_s": round(self.stalled_s, 4),
+            "items": self.items,
+        }
+
+
+def put_item(q: queue.Queue, item, stats: StageStats, stop_event=None) -> bool:
+    """Put into a bounded queue, counting the wait as stalled time.
+
+    Returns False if stop_event was set before there was room.
+    """
+    start = time.perf_counter()
+    try:
+        while True:
+            try:
+                q.put(item, timeout=_POLL_INTERVAL_S)
+                return True
+            except queue.Full:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+    finally:
+        stats.stalled_s += time.perf_counter() - start
+
+
+def get_item(q: queue.Queue, stats: StageStats, stop_event=None):
+    """Get from a queue, counting the wait as stalled time.
+
+    Returns END once stop_event is set and the queue has drained.
+    """
+    start = time.perf_counter()
+    try:
+        while True:
+            try:
+                return q.get(timeout=_POLL_INTERVAL_S)
+            except queue.Empty:
+                if stop_event is not None and stop_event.is_set():
+                    return END
+    finally:
+        stats.stalled_s += time.perf_counter() - start
+
+
+class StageThread(threading.Thread):
+    """Daemon thread that keeps any exception for the caller to re-raise.
+
+    A failing stage sets stop_event so its neighbours stop waiting on it.
+    """
+
+    def __init__(self, target, name: str, stop_event: threading.Event):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self._stop_event = stop_event
+        self.error = None
+
+    def run(self):
+        try:
+            self._target_fn()
+        except BaseException as e:
+            self.error = e
+            self._stop_event.set()
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
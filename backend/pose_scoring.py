@@ -7,8 +7,14 @@ import numpy as np
 import json
 import cv2
 import os
-import mediapipe as mp
-from mediapipe.tasks.python import vision
+import queue
+import threading
+from typing import NamedTuple
+
+from backend import metrics
+from backend.detectors import DetectorMode, create_detector
+from backend.pipeline import END, StageStats, StageThread, get_item, put_item
+from backend.tracing import NULL_TRACER
 
 # ================================
 # Constants and Configuration
@@ -32,6 +38,79 @@ LANDMARKS = {
 ANGLE_TOLERANCE = 15.0
 SCORING_SIGMA = 25.0
 
+# Longest frame side fed to the landmarker; larger frames are downscaled
+# before color conversion. The model's own input is far smaller, so this
+# mostly saves cvtColor and copy work. Unset keeps full resolution.
+MAX_INFERENCE_SIDE = int(os.environ.get("POSE_MAX_INFERENCE_SIDE", 0)) or None
+
+# Joints extract_joint_angles measures by default, in angle-matrix column order.
+SCORED_JOINTS = ["left_knee", "right_knee", "left_hip", "right_hip"]
+
+# Landmarks (a, b, c) whose angle at b is each joint's angle, as measured by
+# ground_truth_reference.py when the reference JSONs were built.
+JOINT_LANDMARKS = {
+    "left_elbow": ("left_shoulder", "left_elbow", "left_wrist"),
+    "right_elbow": ("right_shoulder", "right_elbow", "right_wrist"),
+    "left_shoulder": ("left_elbow", "left_shoulder", "left_hip"),
+    "right_shoulder": ("right_elbow", "right_shoulder", "right_hip"),
+    "left_knee": ("left_hip", "left_knee", "left_ankle"),
+    "right_knee": ("right_hip", "right_knee", "right_ankle"),
+    "left_hip": ("left_shoulder", "left_hip", "left_knee"),
+    "right_hip": ("right_shoulder", "right_hip", "right_knee"),
+}
+ALL_JOINTS = list(JOINT_LANDMARKS)
+
+# Joint sets a score can be computed over. "legs" is what scoring has always
+# used, so it stays the default and existing scores do not move.
+JOINT_SETS = {"legs": SCORED_JOINTS, "full_body": ALL_JOINTS}
+DEFAULT_JOINT_SET = "legs"
+
+class InferenceProfile(NamedTuple):
+    """How the landmarker is built: model asset, running mode and outputs."""
+
+    model_asset: str
+    running_mode: DetectorMode
+    output_segmentation_masks: bool
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(os.path.dirname(__file__), "..", self.model_asset)
+
+
+# Named landmarker configurations. Scoring never reads segmentation masks,
+# so only the explicit *_segmentation profile pays for them.
+INFERENCE_PROFILES = {
+    "lite": InferenceProfile(
+        "pose_landmarker_lite.task", DetectorMode.VIDEO, False
+    ),
+    "full": InferenceProfile(
+        "pose_landmarker_full.task", DetectorMode.VIDEO, False
+    ),
+    "heavy": InferenceProfile(
+        "pose_landmarker_heavy.task", DetectorMode.VIDEO, False
+    ),
+    "heavy_segmentation": InferenceProfile(
+        "pose_landmarker_heavy.task", DetectorMode.VIDEO, True
+    ),
+}
+
+# Profile used when a request does not name one; part of every cache key.
+DEFAULT_PROFILE = os.environ.get("POSE_INFERENCE_PROFILE", "heavy")
+
+# Detector backend every landmarker is built with (see backend.detectors).
+# "replay" serves recorded poses instead of running the model, for load
+# tests; it is part of every cache key so its results never mix with real ones.
+DETECTOR_BACKEND = os.environ.get("POSE_DETECTOR", "mediapipe")
+
+# Decoded frames buffered ahead of inference; bounds memory to a few frames.
+FRAME_QUEUE_SIZE = 8
+# Landmark results buffered ahead of the scorer.
+LANDMARK_QUEUE_SIZE = 64
+
+# Rows a LandmarkBuffer starts with (about a minute of 30 fps video);
+# capacity doubles whenever it fills.
+LANDMARK_BUFFER_INITIAL_FRAMES = 2048
+
 # Available poses and their reference files
 POSE_OPTIONS = {
     "Tree Pose (Vrksasana)": ("ground_truth_tree.json", "Vrksasana"),
@@ -40,6 +119,57 @@ POSE_OPTIONS = {
     "Triangle Pose (Trikonasana)": ("ground_truth_triangle.json", "Trikonasana"),
 }
 
+
+class AnalysisCancelled(Exception):
+    """Raised when a running video analysis is cancelled."""
+
+
+class VideoInfo(NamedTuple):
+    """Container-reported properties of a video file."""
+
+    fps: float
+    total_frames: int
+    width: int
+    height: int
+
+    @property
+    def duration_s(self) -> float:
+        return self.total_frames / self.fps if self.fps > 0 else 0.0
+
+
+class ScoredFrame(NamedTuple):
+    """One frame's score as yielded by iter_video_scores.
+
+    inferred is False for frames skipped by sampling, whose score is
+    interpolated from the inferred frames around them.
+    """
+
+    frame_index: int
+    timestamp_s: float
+    score: float
+    inferred: bool = True
+
+
+class LandmarkSequence(NamedTuple):
+    """Per-frame landmarks of a video in compact array form.
+
+    landmarks is float32 (frames, 33, 4) holding x, y, z and visibility;
+    valid marks the frames where a pose was detected. When the video was
+    sampled with a stride, frame_indices gives each row's frame number in
+    the video and total_frames the video's full length.
+    """
+
+    landmarks: np.ndarray
+    valid: np.ndarray
+    fps: float
+    frame_indices: np.ndarray
+    total_frames: int
+
+    @property
+    def is_sampled(self) -> bool:
+        return len(self.frame_indices) != self.total_frames
+
+
 # ================================
 # Utility Functions
 # ================================
@@ -76,29 +206,11 @@ def normalize_landmarks(landmarks):
     return normalized
 
 
-def extract_joint_angles(lm):
+def extract_joint_angles(lm, joints: list[str] = SCORED_JOINTS):
     """Extract joint angles from landmarks."""
     return {
-        "left_knee": calculate_angle(
-            lm[LANDMARKS["left_hip"]],
-            lm[LANDMARKS["left_knee"]],
-            lm[LANDMARKS["left_ankle"]],
-        ),
-        "right_knee": calculate_angle(
-            lm[LANDMARKS["right_hip"]],
-            lm[LANDMARKS["right_knee"]],
-            lm[LANDMARKS["right_ankle"]],
-        ),
-        "left_hip": calculate_angle(
-            lm[LANDMARKS["left_shoulder"]],
-            lm[LANDMARKS["left_hip"]],
-            lm[LANDMARKS["left_knee"]],
-        ),
-        "right_hip": calculate_angle(
-            lm[LANDMARKS["right_shoulder"]],
-            lm[LANDMARKS["right_hip"]],
-            lm[LANDMARKS["right_knee"]],
-        ),
+        joint: calculate_angle(*(lm[LANDMARKS[name]] for name in JOINT_LANDMARKS[joint]))
+        for joint in joints
     }
 
 
@@ -146,72 +258,635 @@ def load_reference_pose(pose_name: str) -> dict:
     return pose_library[pose_key]
 
 
-def load_pose_landmarker():
-    """Load MediaPipe PoseLandmarker model."""
-    model_path = os.path.join(
-        os.path.dirname(__file__), "..", "pose_landmarker_heavy.task"
+def load_pose_landmarker(profile: str = DEFAULT_PROFILE):
+    """Build a PoseDetector for an inference profile on DETECTOR_BACKEND."""
+    inference_profile = INFERENCE_PROFILES[profile]
+    return create_detector(
+        DETECTOR_BACKEND,
+        model_path=inference_profile.model_path,
+        mode=inference_profile.running_mode,
+        output_segmentation_masks=inference_profile.output_segmentation_masks,
     )
 
-    base_options = mp.tasks.BaseOptions(model_asset_path=model_path)
-    options = mp.tasks.vision.PoseLandmarkerOptions(
-        base_options=base_options,
-        running_mode=vision.RunningMode.VIDEO,
-        output_segmentation_masks=True,
-    )
-    return mp.tasks.vision.PoseLandmarker.create_from_options(options)
 
+def resize_frame(frame, max_side: int | None = None):
+    """Downscale a frame so its longer side is at most max_side.
 
-def process_video(video_path: str, reference_angles: dict) -> tuple[list[float], float]:
+    Landmarks are normalized, so scale does not change their coordinates.
     """
-    Process video and score each frame.
-    Returns (scores_over_time, fps).
+    height, width = frame.shape[:2]
+    if max_side is not None and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    return frame
+
+
+def prepare_frame(frame, max_side: int | None = None):
+    """Convert a decoded BGR frame to RGB, downscaling it first if needed.
+
+    Resizing before the conversion means cvtColor only touches the
+    downscaled pixels.
     """
-    landmarker = load_pose_landmarker()
+    return cv2.cvtColor(resize_frame(frame, max_side), cv2.COLOR_BGR2RGB)
+
 
+def read_video_info(video_path: str) -> VideoInfo:
+    """Read fps, frame count and size from the container without decoding."""
     cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
+    try:
+        return VideoInfo(
+            cap.get(cv2.CAP_PROP_FPS),
+            int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+    finally:
+        cap.release()
 
-    all_frame_landmarks = []
 
-    # Phase 1: Extract landmarks
-    frame_index = 0
+def detect_landmarks(landmarker, rgb_frame, timestamp_ms: int) -> np.ndarray | None:
+    """Run a VIDEO-mode detector on one RGB frame.
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
+    Returns the first pose as a float32 (33, 4) array, or None.
+    """
+    with metrics.DETECT_SECONDS.time():
+        detection = landmarker.detect_for_video(rgb_frame, timestamp_ms)
 
-        mp_image = mp.Image(
-            image_format=mp.ImageFormat.SRGB,
-            data=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB),
-        )
+    metrics.FRAMES_PROCESSED.inc()
+    if detection.landmarks is None:
+        metrics.FRAMES_WITHOUT_DETECTION.inc()
+    return detection.landmarks
 
-        timestamp_ms = int((frame_index / fps) * 1000)
-        detection_result = landmarker.detect_for_video(mp_image, timestamp_ms)
 
-        if detection_result.pose_landmarks:
-            all_frame_landmarks.append(detection_result.pose_landmarks[0])
-        else:
-            all_frame_landmarks.append(None)
+def score_landmarks_xy(
+    landmarks_np, reference_angles: dict, joints: list[str] = SCORED_JOINTS
+) -> float:
+    """Score one frame given its (33, 2) landmark x/y coordinates.
 
-        frame_index += 1
+    Single frames go through the scalar functions, which are faster for
+    one row than score_landmark_array; its per-call overhead only pays off
+    over many frames (benchmarks/bench_scoring.py). Both give the same scores.
+    """
+    angles = extract_joint_angles(normalize_landmarks(landmarks_np), joints)
+    return float(mae_to_score(compute_mae(angles, reference_angles)))
 
-    cap.release()
-    landmarker.close()
 
-    # Phase 2: Score frames
-    scores_over_time = []
+def sample_stride(fps: float, stride: int = 1, target_fps: float | None = None) -> int:
+    """Frames to advance per inferred frame; target_fps overrides stride."""
+    if target_fps is not None and target_fps > 0 and fps > 0:
+        return max(1, round(fps / target_fps))
+    return max(1, stride)
+
 
-    for landmarks in all_frame_landmarks:
-        if landmarks is None:
-            scores_over_time.append(0.0)
+def interpolate_scores(frame_indices, scores, total_frames: int) -> list[float]:
+    """Linearly fill scores for frames that were skipped by sampling."""
+    if len(frame_indices) == 0:
+        return [0.0] * total_frames
+    return np.interp(np.arange(total_frames), frame_indices, scores).tolist()
+
+
+def landmark_array_to_sequence(
+    landmarks: np.ndarray, valid: np.ndarray, fps: float
+) -> LandmarkSequence:
+    """Build a LandmarkSequence from a (frames, 33, 2-4) array and validity bitmap."""
+    if landmarks.ndim != 3 or landmarks.shape[1] != 33 or not 2 <= landmarks.shape[2] <= 4:
+        raise ValueError(
+            f"Expected (frames, 33, 2-4) landmarks, got shape {landmarks.shape}"
+        )
+    padded = np.zeros((len(landmarks), 33, 4), dtype=np.float32)
+    padded[:, :, : landmarks.shape[2]] = landmarks
+    padded[~valid] = 0.0
+    return LandmarkSequence(
+        padded,
+        np.asarray(valid, dtype=bool),
+        fps,
+        np.arange(len(landmarks), dtype=np.int32),
+        len(landmarks),
+    )
+
+
+def landmark_rows_to_sequence(frames, fps: float) -> LandmarkSequence:
+    """Build a LandmarkSequence from plain per-frame landmark lists.
+
+    Each frame is None (no detection) or 33 rows of 2 to 4 values: x, y
+    and optionally z and visibility. Raises ValueError on any other shape.
+    """
+    landmarks = np.zeros((len(frames), 33, 4), dtype=np.float32)
+    valid = np.zeros(len(frames), dtype=bool)
+
+    for i, frame in enumerate(frames):
+        if frame is None:
             continue
+        try:
+            rows = np.asarray(frame, dtype=np.float32)
+        except ValueError:
+            raise ValueError(
+                f"Frame {i}: landmark rows must all be the same length"
+            ) from None
+        if rows.ndim != 2 or rows.shape[0] != 33 or not 2 <= rows.shape[1] <= 4:
+            raise ValueError(
+                f"Frame {i}: expected 33 landmarks of 2-4 values, got shape {rows.shape}"
+            )
+        landmarks[i, :, : rows.shape[1]] = rows
+        valid[i] = True
+
+    return LandmarkSequence(
+        landmarks, valid, fps, np.arange(len(frames), dtype=np.int32), len(frames)
+    )
+
+
+class LandmarkBuffer:
+    """Growable array store for the landmarks process_video infers.
+
+    Each frame's landmarks are copied into one preallocated float32
+    (frames, 33, 4) array as they arrive, with a validity bitmap for frames
+    without a detection.
+    """
+
+    def __init__(self, capacity: int = LANDMARK_BUFFER_INITIAL_FRAMES):
+        capacity = max(1, capacity)
+        self._landmarks = np.zeros((capacity, 33, 4), dtype=np.float32)
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._frame_indices = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+        self.total_frames = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        return self._landmarks[: self.count]
+
+    @property
+    def valid(self) -> np.ndarray:
+        return self._valid[: self.count]
+
+    @property
+    def frame_indices(self) -> np.ndarray:
+        return self._frame_indices[: self.count]
+
+    def append(self, frame_index: int, landmarks) -> int:
+        """Store one frame's (33, 4) landmarks (None if undetected); returns its row."""
+        if self.count == len(self._valid):
+            self._grow()
+        row = self.count
+        if landmarks is not None:
+            self._landmarks[row] = landmarks
+            self._valid[row] = True
+        self._frame_indices[row] = frame_index
+        self.count += 1
+        return row
+
+    def _grow(self):
+        capacity = 2 * len(self._valid)
+        landmarks = np.zeros((capacity, 33, 4), dtype=np.float32)
+        valid = np.zeros(capacity, dtype=bool)
+        frame_indices = np.zeros(capacity, dtype=np.int32)
+        landmarks[: self.count] = self.landmarks
+        valid[: self.count] = self.valid
+        frame_indices[: self.count] = self.frame_indices
+        self._landmarks, self._valid, self._frame_indices = (
+            landmarks,
+            valid,
+            frame_indices,
+        )
+
+    def to_sequence(self, fps: float) -> LandmarkSequence:
+        """Trimmed copy of the stored rows, releasing unused capacity."""
+        total_frames = self.total_frames or self.count
+        return LandmarkSequence(
+            self.landmarks.copy(),
+            self.valid.copy(),
+            fps,
+            self.frame_indices.copy(),
+            total_frames,
+        )
+
+
+# ================================
+# Vectorized Scoring
+# ================================
+
+
+def normalize_landmark_array(xy: np.ndarray) -> np.ndarray:
+    """normalize_landmarks over a whole (frames, 33, 2) array at once."""
+    hip_center = (xy[:, LANDMARKS["left_hip"]] + xy[:, LANDMARKS["right_hip"]]) / 2
+    shoulder_width = (
+        np.linalg.norm(
+            xy[:, LANDMARKS["left_shoulder"]] - xy[:, LANDMARKS["right_shoulder"]],
+            axis=1,
+        )
+        + 1e-6
+    )
+    return (xy - hip_center[:, None, :]) / shoulder_width[:, None, None]
+
+
+def joint_angle_array(
+    xy: np.ndarray, joints: list[str] = SCORED_JOINTS
+) -> np.ndarray:
+    """(frames, joints) angles in degrees, as calculate_angle computes them."""
+    triplets = np.array(
+        [[LANDMARKS[name] for name in JOINT_LANDMARKS[joint]] for joint in joints],
+        dtype=np.intp,
+    ).reshape(len(joints), 3)
+    a = xy[:, triplets[:, 0]]
+    b = xy[:, triplets[:, 1]]
+    c = xy[:, triplets[:, 2]]
+
+    radians = np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0]) - np.arctan2(
+        a[..., 1] - b[..., 1], a[..., 0] - b[..., 0]
+    )
+    angles = np.abs(radians * 180.0 / np.pi)
+    return np.where(angles > 180.0, 360 - angles, angles)
 
-        landmarks_np = np.array([[lm.x, lm.y] for lm in landmarks])
-        norm_landmarks = normalize_landmarks(landmarks_np)
-        angles = extract_joint_angles(norm_landmarks)
-        mae = compute_mae(angles, reference_angles)
-        score = mae_to_score(mae)
-        scores_over_time.append(score)
+
+def reference_vector(
+    reference_angles: dict, joints: list[str] = SCORED_JOINTS
+) -> np.ndarray:
+    """Reference angles in `joints` order; NaN for joints it does not define."""
+    return np.array([reference_angles.get(joint, np.nan) for joint in joints], dtype=float)
+
+
+def score_landmark_array(
+    xy: np.ndarray,
+    reference_angles: dict,
+    valid: np.ndarray | None = None,
+    joints: list[str] = SCORED_JOINTS,
+) -> np.ndarray:
+    """Score a (frames, 33, 2) landmark array against one pose.
+
+    Normalization, joint angles, angular errors and scores are each one
+    array operation over every frame. Frames where valid is False score 0.
+    """
+    angles = joint_angle_array(normalize_landmark_array(xy), joints)
+    if valid is not None:
+        angles[~valid] = np.nan
+    references = reference_vector(reference_angles, joints)[None, :]
+    return score_angle_matrix(angles, references)[:, 0]
+
+
+def score_landmark_sequence(
+    sequence: LandmarkSequence,
+    reference_angles: dict,
+    joints: list[str] = SCORED_JOINTS,
+) -> list[float]:
+    """Phase 2 only: score previously extracted landmarks, one per video frame."""
+    xy = sequence.landmarks[:, :, :2].astype(np.float64)
+    scores = score_landmark_array(xy, reference_angles, sequence.valid, joints)
+    if sequence.is_sampled:
+        return interpolate_scores(sequence.frame_indices, scores, sequence.total_frames)
+    return scores.tolist()
+
+
+def joint_angle_matrix(
+    sequence: LandmarkSequence, joints: list[str] = SCORED_JOINTS
+) -> np.ndarray:
+    """(frames, joints) angles in `joints` order; NaN where undetected."""
+    xy = sequence.landmarks[:, :, :2].astype(np.float64)
+    angles = joint_angle_array(normalize_landmark_array(xy), joints)
+    angles[~sequence.valid] = np.nan
+    return angles
+
+
+def reference_matrix(
+    pose_names: list[str], joints: list[str] = SCORED_JOINTS
+) -> np.ndarray:
+    """(poses, joints) reference angles in `joints` order.
+
+    Joints a reference does not define are NaN and left out of its MAE.
+    """
+    return np.array(
+        [reference_vector(load_reference_pose(name), joints) for name in pose_names]
+    ).reshape(len(pose_names), len(joints))
+
+
+def score_angle_matrix(
+    angles: np.ndarray, references: np.ndarray, sigma: float = SCORING_SIGMA
+) -> np.ndarray:
+    """Score every frame against every pose at once.
+
+    angles is (frames, joints) and references is (poses, joints); returns
+    (frames, poses) scores matching compute_mae + mae_to_score per pair.
+    Frames whose angles are NaN (no detection) score 0.
+    """
+    # (frames, poses, joints) shortest angular distances
+    diff = (references[None, :, :] - angles[:, None, :] + 180) % 360 - 180
+    errors = np.abs(diff)
+
+    joint_mask = ~np.isnan(references)[None, :, :]
+    total_error = np.where(joint_mask, errors, 0.0).sum(axis=2)
+    mae = total_error / (joint_mask.sum(axis=2) + 1e-6)
+
+    scores = 100.0 * np.exp(-(mae**2) / (2 * sigma**2))
+    scores[scores < 1.0] = 0.0
+    scores[np.isnan(angles).any(axis=1)] = 0.0
+    return scores
+
+
+def score_all_poses(
+    sequence: LandmarkSequence,
+    pose_names: list[str],
+    joints: list[str] = SCORED_JOINTS,
+) -> np.ndarray:
+    """(frames, poses) score matrix for one landmark sequence, one row per video frame."""
+    scores = score_angle_matrix(
+        joint_angle_matrix(sequence, joints), reference_matrix(pose_names, joints)
+    )
+    if not sequence.is_sampled:
+        return scores
+
+    expanded = np.zeros((sequence.total_frames, len(pose_names)))
+    for p in range(len(pose_names)):
+        expanded[:, p] = interpolate_scores(
+            sequence.frame_indices, scores[:, p], sequence.total_frames
+        )
+    return expanded
+
+
+# ================================
+# Video Processing
+# ================================
+
+
+class FrameDecoder(StageThread):
+    """Decoder stage: reads a capture into a bounded queue of RGB frames.
+
+    Only every stride-th frame is decoded and queued as (frame_index, rgb);
+    the others are grabbed without decoding. END follows the last frame.
+    frames_read counts every frame, decoded or not.
+    """
+
+    def __init__(
+        self,
+        cap,
+        stride: int,
+        max_side: int | None,
+        stats: StageStats,
+        stop_event: threading.Event,
+        tracer=NULL_TRACER,
+    ):
+        super().__init__(self._decode, "decode", stop_event)
+        self.frames = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+        self.frames_read = 0
+        self._cap = cap
+        self._stride = stride
+        self._max_side = max_side
+        self._stats = stats
+        self._tracer = tracer
+
+    def _decode(self):
+        try:
+            while self._cap.isOpened() and not self._stop_event.is_set():
+                inferred = self.frames_read % self._stride == 0
+                frame_index = self.frames_read
+                with self._stats.busy():
+                    if inferred:
+                        with (
+                            metrics.DECODE_SECONDS.time(),
+                            self._tracer.span("read", frame=frame_index),
+                        ):
+                            ret, frame = self._cap.read()
+                        if ret:
+                            with (
+                                metrics.COLOR_CONVERT_SECONDS.time(),
+                                self._tracer.span("cvtColor", frame=frame_index),
+                            ):
+                                frame = prepare_frame(frame, self._max_side)
+                    else:
+                        with (
+                            metrics.DECODE_SECONDS.time(),
+                            self._tracer.span("grab", frame=frame_index),
+                        ):
+                            ret = self._cap.grab()
+                if not ret:
+                    break
+                self.frames_read += 1
+                if inferred and not put_item(
+                    self.frames,
+                    (frame_index, frame),
+                    self._stats,
+                    self._stop_event,
+                ):
+                    return
+        finally:
+            put_item(self.frames, END, self._stats, self._stop_event)
+
+
+def iter_video_scores(
+    video_path: str,
+    reference_angles: dict,
+    landmarker=None,
+    stride: int = 1,
+    target_fps: float | None = None,
+    max_side: int | None = MAX_INFERENCE_SIDE,
+    profile: str = DEFAULT_PROFILE,
+    joints: list[str] = SCORED_JOINTS,
+    tracer=NULL_TRACER,
+):
+    """Yield a ScoredFrame for every video frame as soon as it is scored.
+
+    Each decoded frame is inferred and scored in one pass and its landmarks
+    dropped, so memory stays bounded however long the video is. Stopping
+    iteration (or closing the generator) ends decoding and releases the
+    video. With stride > 1, skipped frames are yielded with interpolated
+    scores once the next inferred frame is known, matching process_video.
+    """
+    owns_landmarker = landmarker is None
+    if owns_landmarker:
+        landmarker = load_pose_landmarker(profile)
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    stride = sample_stride(fps, stride, target_fps)
+
+    stop_event = threading.Event()
+    decoder = FrameDecoder(
+        cap, stride, max_side, StageStats("decode"), stop_event, tracer
+    )
+    inference_stats = StageStats("inference")
+    decoder.start()
+
+    def scored(frame_index: int, score: float, inferred: bool = False) -> ScoredFrame:
+        timestamp_s = frame_index / fps if fps > 0 else 0.0
+        return ScoredFrame(frame_index, timestamp_s, float(score), inferred)
+
+    previous = None
+    try:
+        while True:
+            item = get_item(decoder.frames, inference_stats, stop_event)
+            if item is END:
+                break
+            frame_index, frame = item
+
+            timestamp_ms = int((frame_index / fps) * 1000)
+            with tracer.span("detect_for_video", frame=frame_index):
+                landmarks = detect_landmarks(landmarker, frame, timestamp_ms)
+            if landmarks is None:
+                score = 0.0
+            else:
+                with (
+                    metrics.SCORE_SECONDS.time(),
+                    tracer.span("score", frame=frame_index),
+                ):
+                    score = score_landmarks_xy(
+                        landmarks[:, :2].astype(np.float64), reference_angles, joints
+                    )
+
+            if previous is not None:
+                previous_index, previous_score = previous
+                for skipped in range(previous_index + 1, frame_index):
+                    fraction = (skipped - previous_index) / (frame_index - previous_index)
+                    yield scored(
+                        skipped, previous_score + fraction * (score - previous_score)
+                    )
+            yield scored(frame_index, score, inferred=True)
+            previous = frame_index, score
+
+        decoder.join()
+        decoder.raise_error()
+        if previous is not None:
+            # Frames after the last inferred one keep its score.
+            previous_index, previous_score = previous
+            for skipped in range(previous_index + 1, decoder.frames_read):
+                yield scored(skipped, previous_score)
+    finally:
+        stop_event.set()
+        decoder.join()
+        cap.release()
+        if owns_landmarker:
+            landmarker.close()
+
+
+def process_video(
+    video_path: str,
+    reference_angles: dict | None,
+    landmarker=None,
+    progress_callback=None,
+    cancel_event=None,
+    stage_stats: dict | None = None,
+    landmark_buffer: LandmarkBuffer | None = None,
+    stride: int = 1,
+    target_fps: float | None = None,
+    max_side: int | None = MAX_INFERENCE_SIDE,
+    profile: str = DEFAULT_PROFILE,
+    joints: list[str] = SCORED_JOINTS,
+    tracer=NULL_TRACER,
+) -> tuple[list[float], float]:
+    """
+    Process video and score each frame.
+
+    Decoding, inference and scoring run as overlapping stages: a decoder
+    thread fills a bounded frame queue, this thread runs the landmarker, and
+    a scorer thread consumes landmarks as they arrive.
+
+    A pooled landmarker may be passed in; otherwise one is loaded for the
+    given inference profile and closed here.
+    progress_callback(frames_done, total_frames) is called after each frame, and
+    setting cancel_event aborts the analysis with AnalysisCancelled.
+    If stage_stats is a dict it is filled with each stage's StageStats.
+    Each inferred frame's landmarks are copied into a LandmarkBuffer, which
+    the scorer reads directly. If one is given, it is filled here so the
+    landmarks can be cached and re-scored later; with reference_angles=None
+    only that extraction is done and scores is empty.
+
+    With stride > 1 (or a target_fps below the video's) only every stride-th
+    frame is decoded and inferred; the others are grabbed without decoding
+    and their scores interpolated, so scores still has one entry per frame.
+    Frames whose longest side exceeds max_side are downscaled in the decoder.
+    joints picks which joint angles are compared with the reference.
+    A tracing.Tracer records a span per stage and frame on each thread.
+    Returns (scores_over_time, fps).
+    """
+    owns_landmarker = landmarker is None
+    if owns_landmarker:
+        landmarker = load_pose_landmarker(profile)
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    stride = sample_stride(fps, stride, target_fps)
+
+    decode_stats = StageStats("decode")
+    inference_stats = StageStats("inference")
+    scoring_stats = StageStats("scoring")
+    if stage_stats is not None:
+        for stats in (decode_stats, inference_stats, scoring_stats):
+            stage_stats[stats.name] = stats
+
+    landmark_queue = queue.Queue(maxsize=LANDMARK_QUEUE_SIZE)
+    stop_event = threading.Event()
+    if landmark_buffer is None:
+        landmark_buffer = LandmarkBuffer()
+    scores_over_time = []
+
+    def score():
+        while True:
+            item = get_item(landmark_queue, scoring_stats, stop_event)
+            if item is END:
+                return
+            frame_index, landmarks = item
+            landmark_buffer.append(frame_index, landmarks)
+            if reference_angles is None:
+                continue
+            if landmarks is None:
+                scores_over_time.append(0.0)
+                continue
+            with (
+                scoring_stats.busy(),
+                metrics.SCORE_SECONDS.time(),
+                tracer.span("score", frame=frame_index),
+            ):
+                score = score_landmarks_xy(
+                    landmarks[:, :2].astype(np.float64), reference_angles, joints
+                )
+            scores_over_time.append(score)
+
+    decoder = FrameDecoder(cap, stride, max_side, decode_stats, stop_event, tracer)
+    scorer = StageThread(score, "scoring", stop_event)
+    decoder.start()
+    scorer.start()
+
+    try:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise AnalysisCancelled(video_path)
+
+            item = get_item(decoder.frames, inference_stats, stop_event)
+            if item is END:
+                break
+            frame_index, frame = item
+
+            with (
+                inference_stats.busy(),
+                tracer.span("detect_for_video", frame=frame_index),
+            ):
+                timestamp_ms = int((frame_index / fps) * 1000)
+                landmarks = detect_landmarks(landmarker, frame, timestamp_ms)
+            if not put_item(
+                landmark_queue, (frame_index, landmarks), inference_stats, stop_event
+            ):
+                break
+
+            if progress_callback is not None:
+                progress_callback(frame_index + 1, total_frames)
+    finally:
+        # The scorer drains what is queued, then sees the stop and exits.
+        stop_event.set()
+        decoder.join()
+        scorer.join()
+        cap.release()
+        if owns_landmarker:
+            landmarker.close()
+
+    decoder.raise_error()
+    scorer.raise_error()
+
+    landmark_buffer.total_frames = decoder.frames_read
+    if stride > 1 and reference_angles is not None:
+        scores_over_time = interpolate_scores(
+            landmark_buffer.frame_indices, scores_over_time, decoder.frames_read
+        )
 
     return scores_over_time, fps
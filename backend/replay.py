@@ -0,0 +1,154 @@
+"""
+Pose detector that replays recorded poses instead of running a model.
+Each frame returns one of the recorded landmark sets (yoga_landmarks/ and
+the frontend's reference poses), cycling through them with a little
+deterministic jitter, so the pipeline can be exercised and benchmarked
+without a .task model file.
+"""
+
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from backend.detectors import NO_DETECTION, Detection, DetectorMode, PoseDetector
+
+# ================================
+# Configuration
+# ================================
+
+_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+RECORDED_LANDMARK_GLOBS = [
+    os.path.join(_ROOT, "yoga_landmarks", "*.json"),
+    os.path.join(_ROOT, "pose-estimation-app", "src", "lib", "*.json"),
+]
+
+# Frames a recorded pose is held for before moving to the next one.
+REPLAY_HOLD_FRAMES = 30
+
+# Standard deviation of the per-frame jitter, in normalized coordinates.
+REPLAY_JITTER = 0.003
+
+# ================================
+# Recorded Poses
+# ================================
+
+
+def load_recorded_poses(patterns=RECORDED_LANDMARK_GLOBS) -> dict[str, np.ndarray]:
+    """Recorded poses by file name, each a float32 (33, 4) array.
+
+    Files are lists of 33 {x, y, z, visibility} objects; others are skipped.
+    """
+    poses = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            with open(path) as f:
+                data = json.load(f)
+            if not isinstance(data, list) or len(data) != 33:
+                continue
+            name = os.path.splitext(os.path.basename(path))[0]
+            poses.setdefault(
+                name,
+                np.array(
+                    [[lm["x"], lm["y"], lm["z"], lm["visibility"]] for lm in data],
+                    dtype=np.float32,
+                ),
+            )
+    return poses
+
+
+# ================================
+# Replay Detector
+# ================================
+
+
+class ReplayDetector(PoseDetector):
+    """PoseDetector that returns recorded poses.
+
+    In VIDEO and LIVE_STREAM mode the pose for a frame depends only on its
+    timestamp, so runs are repeatable; IMAGE mode steps through frames in
+    call order. miss_every > 0 reports no pose on every miss_every-th
+    frame, and latency_ms sleeps per call to stand in for inference cost.
+    LIVE_STREAM results are delivered from a worker thread, as MediaPipe
+    does, so that sleep does not block the caller.
+    """
+
+    backend = "replay"
+
+    def __init__(
+        self,
+        poses: dict[str, np.ndarray] | None = None,
+        fps: float = 30.0,
+        hold_frames: int = REPLAY_HOLD_FRAMES,
+        jitter: float = REPLAY_JITTER,
+        miss_every: int = 0,
+        latency_ms: float = 0.0,
+        mode: DetectorMode = DetectorMode.VIDEO,
+        result_callback=None,
+    ):
+        super().__init__(mode, result_callback)
+        poses = load_recorded_poses() if poses is None else poses
+        if not poses:
+            raise ValueError("No recorded poses to replay")
+        self.pose_names = list(poses)
+        self._poses = np.stack(list(poses.values()))
+        self._fps = fps
+        self._hold_frames = max(1, hold_frames)
+        self._jitter = jitter
+        self._miss_every = miss_every
+        self._latency_s = latency_ms / 1000
+        self._image_count = 0
+        self._requests = None
+        self._worker = None
+        if self.mode is DetectorMode.LIVE_STREAM:
+            self._requests = queue.Queue()
+            self._worker = threading.Thread(
+                target=self._run_live_stream, name="replay-live-stream", daemon=True
+            )
+            self._worker.start()
+
+    def landmarks_at(self, frame_number: int) -> np.ndarray | None:
+        """The (33, 4) landmarks replayed for a frame, or None for a miss."""
+        if self._miss_every > 0 and frame_number % self._miss_every == 0:
+            return None
+        pose = self._poses[(frame_number // self._hold_frames) % len(self._poses)]
+        if self._jitter <= 0:
+            return pose.copy()
+        rng = np.random.default_rng(zlib.crc32(frame_number.to_bytes(8, "little")))
+        noise = rng.normal(0.0, self._jitter, (33, 2)).astype(np.float32)
+        jittered = pose.copy()
+        jittered[:, :2] += noise
+        return jittered
+
+    def _detect(self, rgb_frame, timestamp_ms: int | None) -> Detection:
+        if timestamp_ms is None:
+            frame_number = self._image_count
+            self._image_count += 1
+        else:
+            frame_number = round(timestamp_ms * self._fps / 1000)
+        if self._latency_s > 0:
+            time.sleep(self._latency_s)
+        landmarks = self.landmarks_at(frame_number)
+        if landmarks is None:
+            return NO_DETECTION
+        return Detection(landmarks)
+
+    def _detect_async(self, rgb_frame, timestamp_ms: int):
+        self._requests.put((rgb_frame, timestamp_ms))
+
+    def _run_live_stream(self):
+        while (request := self._requests.get()) is not None:
+            rgb_frame, timestamp_ms = request
+            self._result_callback(self._detect(rgb_frame, timestamp_ms), timestamp_ms)
+
+    def close(self):
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join()
+            self._worker = None
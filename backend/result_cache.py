@@ -0,0 +1,258 @@
+"""
+Content-addressed caches for video analysis.
+Entries are keyed by the video's hash plus every setting that affects them,
+kept in an in-memory LRU and mirrored to a size-bounded disk cache.
+
+ResultCache holds finished results for one pose; LandmarkCache holds the
+pose-independent landmarks so another pose can be scored without inference.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.pose_scoring import (
+    DEFAULT_JOINT_SET,
+    DEFAULT_PROFILE,
+    DETECTOR_BACKEND,
+    SCORING_SIGMA,
+    LandmarkSequence,
+)
+
+# ================================
+# Configuration
+# ================================
+
+CACHE_DIR = os.environ.get(
+    "POSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pose_scoring_cache")
+)
+CACHE_MEMORY_ENTRIES = int(os.environ.get("POSE_CACHE_MEMORY_ENTRIES", 256))
+CACHE_DISK_BYTES = int(os.environ.get("POSE_CACHE_DISK_MB", 512)) * 1024 * 1024
+
+# Landmark arrays are a few MB per long video, so fewer are kept in memory.
+LANDMARK_CACHE_MEMORY_ENTRIES = int(
+    os.environ.get("POSE_LANDMARK_CACHE_MEMORY_ENTRIES", 16)
+)
+LANDMARK_CACHE_DISK_BYTES = (
+    int(os.environ.get("POSE_LANDMARK_CACHE_DISK_MB", 2048)) * 1024 * 1024
+)
+
+# ================================
+# Cache Keys
+# ================================
+
+
+def result_key(
+    video_sha256: str,
+    pose_name: str,
+    sigma: float = SCORING_SIGMA,
+    profile: str = DEFAULT_PROFILE,
+    extraction: str = "default",
+    joint_set: str = DEFAULT_JOINT_SET,
+    detector: str = DETECTOR_BACKEND,
+) -> str:
+    """Cache key for one video scored against one pose.
+
+    extraction describes how frames were sampled and scaled for inference.
+    """
+    parts = json.dumps(
+        [video_sha256, pose_name, sigma, profile, extraction, joint_set, detector]
+    )
+    return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+
+def landmark_key(
+    video_sha256: str,
+    profile: str = DEFAULT_PROFILE,
+    extraction: str = "default",
+    detector: str = DETECTOR_BACKEND,
+) -> str:
+    """Cache key for one video's extracted landmarks."""
+    parts = json.dumps(["landmarks", video_sha256, profile, extraction, detector])
+    return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+
+# ================================
+# Caches
+# ================================
+
+
+class _TwoLevelCache:
+    """In-memory LRU in front of a size-bounded directory of files.
+
+    Subclasses set `extension` and implement _dump(value, f) / _load(f).
+    """
+
+    extension = ""
+    binary = False
+
+    def __init__(
+        self,
+        directory: str | None,
+        memory_entries: int,
+        disk_bytes: int,
+    ):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        value = self._read_disk(key)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._remember(key, value)
+        self._write_disk(key, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def _remember(self, key: str, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.extension)
+
+    def _read_disk(self, key: str):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb" if self.binary else "r") as f:
+                value = self._load(f)
+        except (OSError, ValueError, KeyError):
+            return None
+        # mtime doubles as the disk layer's last-used time.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _write_disk(self, key: str, value):
+        if not self.directory:
+            return
+        # Write then rename so readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb" if self.binary else "w") as f:
+            self._dump(value, f)
+        os.replace(tmp_path, self._path(key))
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete least recently used entries until the disk layer fits."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.extension):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+
+
+class ResultCache(_TwoLevelCache):
+    """Two-level LRU cache of JSON-serializable analysis results."""
+
+    extension = ".json"
+
+    def __init__(
+        self,
+        directory: str | None = CACHE_DIR,
+        memory_entries: int = CACHE_MEMORY_ENTRIES,
+        disk_bytes: int = CACHE_DISK_BYTES,
+    ):
+        super().__init__(directory, memory_entries, disk_bytes)
+
+    def _dump(self, value, f):
+        json.dump(value, f)
+
+    def _load(self, f):
+        return json.load(f)
+
+
+class LandmarkCache(_TwoLevelCache):
+    """Two-level LRU cache of LandmarkSequence arrays, stored as .npz files."""
+
+    extension = ".npz"
+    binary = True
+
+    def __init__(
+        self,
+        directory: str | None = CACHE_DIR,
+        memory_entries: int = LANDMARK_CACHE_MEMORY_ENTRIES,
+        disk_bytes: int = LANDMARK_CACHE_DISK_BYTES,
+    ):
+        super().__init__(directory, memory_entries, disk_bytes)
+
+    def _dump(self, value: LandmarkSequence, f):
+        np.savez_compressed(
+            f,
+            landmarks=value.landmarks,
+            valid=value.valid,
+            fps=value.fps,
+            frame_indices=value.frame_indices,
+            total_frames=value.total_frames,
+        )
+
+    def _load(self, f) -> LandmarkSequence:
+        with np.load(f) as data:
+            return LandmarkSequence(
+                data["landmarks"],
+                data["valid"],
+                float(data["fps"]),
+                data["frame_indices"],
+                int(data["total_frames"]),
+            )
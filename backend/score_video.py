@@ -0,0 +1,69 @@
+"""
+Command-line video scoring that prints each frame's score as it is computed.
+
+Usage:
+    python -m backend.score_video path/to/video.mp4 --pose "Tree Pose (Vrksasana)"
+        [--stride 2] [--max-seconds 30] [--trace trace.json]
+"""
+
+import argparse
+
+from backend.pose_scoring import (
+    DEFAULT_JOINT_SET,
+    DEFAULT_PROFILE,
+    INFERENCE_PROFILES,
+    JOINT_SETS,
+    MAX_INFERENCE_SIDE,
+    POSE_OPTIONS,
+    iter_video_scores,
+    load_reference_pose,
+)
+from backend.tracing import NULL_TRACER, Tracer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("video")
+    parser.add_argument("--pose", choices=list(POSE_OPTIONS), default=next(iter(POSE_OPTIONS)))
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--target-fps", type=float, default=None)
+    parser.add_argument("--max-side", type=int, default=MAX_INFERENCE_SIDE)
+    parser.add_argument("--profile", choices=list(INFERENCE_PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--joint-set", choices=list(JOINT_SETS), default=DEFAULT_JOINT_SET)
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="stop once this much of the video has been scored")
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                        help="write a Chrome trace-event timeline to PATH")
+    args = parser.parse_args()
+
+    tracer = Tracer(args.video) if args.trace else NULL_TRACER
+
+    frames = iter_video_scores(
+        args.video,
+        load_reference_pose(args.pose),
+        stride=args.stride,
+        target_fps=args.target_fps,
+        max_side=args.max_side,
+        profile=args.profile,
+        joints=JOINT_SETS[args.joint_set],
+        tracer=tracer,
+    )
+
+    total = 0.0
+    count = 0
+    for frame in frames:
+        if args.max_seconds is not None and frame.timestamp_s > args.max_seconds:
+            break
+        print(f"{frame.frame_index:6d} {frame.timestamp_s:8.2f}s {frame.score:6.1f}", flush=True)
+        total += frame.score
+        count += 1
+    frames.close()
+    if args.trace:
+        tracer.save(args.trace)
+
+    if count:
+        print(f"average {total / count:.1f} over {count} frames")
+
+
+if __name__ == "__main__":
+    main()
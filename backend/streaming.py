@@ -0,0 +1,84 @@
+"""
+Server-Sent Events helpers for streaming analysis progress.
+Scores are grouped into batches so a long video produces a steady trickle
+of events rather than one per frame.
+"""
+
+import json
+import time
+
+# ================================
+# Configuration
+# ================================
+
+# A batch is sent once it holds this many frames or has waited this long.
+STREAM_BATCH_FRAMES = 30
+STREAM_BATCH_INTERVAL_S = 0.5
+
+# Comment line sent while no event is ready, so idle proxies keep the
+# connection open.
+STREAM_KEEPALIVE_S = 15.0
+SSE_KEEPALIVE = ": keep-alive\n\n"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Disable response buffering in nginx-style reverse proxies.
+    "X-Accel-Buffering": "no",
+}
+
+# ================================
+# Events
+# ================================
+
+
+def format_sse(event: str, data) -> str:
+    """One SSE message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class ScoreBatcher:
+    """Groups per-frame scores into `scores` event payloads with progress.
+
+    emit(event, data) is called with each finished batch.
+    """
+
+    def __init__(self, emit, total_frames: int):
+        self._emit = emit
+        self.total_frames = total_frames
+        self.scores = []
+        self._batch_start = 0
+        self._started = time.perf_counter()
+        self._last_flush = self._started
+
+    def add(self, score: float):
+        self.scores.append(score)
+        now = time.perf_counter()
+        if (
+            len(self.scores) - self._batch_start >= STREAM_BATCH_FRAMES
+            or now - self._last_flush >= STREAM_BATCH_INTERVAL_S
+        ):
+            self.flush(now)
+
+    def flush(self, now: float | None = None):
+        if len(self.scores) == self._batch_start:
+            return
+        now = time.perf_counter() if now is None else now
+
+        frames_done = len(self.scores)
+        elapsed = now - self._started
+        processing_fps = frames_done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total_frames - frames_done, 0)
+
+        self._emit(
+            "scores",
+            {
+                "start": self._batch_start,
+                "scores": self.scores[self._batch_start :],
+                "frames_done": frames_done,
+                "total_frames": self.total_frames,
+                "processing_fps": round(processing_fps, 2),
+                "eta_s": round(remaining / processing_fps, 2) if processing_fps else None,
+            },
+        )
+        self._batch_start = frames_done
+        self._last_flush = now
@@ -0,0 +1,155 @@
+"""
+Per-analysis timelines in the Chrome trace-event format.
+A Tracer records one complete ("X") event per span, tagged with the thread
+that ran it, and saves them as JSON that chrome://tracing and Perfetto
+open directly. Code takes a tracer argument that defaults to NULL_TRACER,
+whose spans do nothing, so instrumentation costs one call when disabled.
+"""
+
+import glob
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# ================================
+# Configuration
+# ================================
+
+# Directory that API analyses write their traces to; unset disables tracing.
+TRACE_DIR = os.environ.get("POSE_TRACE_DIR") or None
+
+# Fraction of analyses traced when TRACE_DIR is set.
+TRACE_SAMPLE_RATE = float(os.environ.get("POSE_TRACE_SAMPLE_RATE", 1.0))
+
+# Newest trace files kept in TRACE_DIR; older ones are deleted on save.
+TRACE_KEEP = int(os.environ.get("POSE_TRACE_KEEP", 200))
+
+# ================================
+# Tracers
+# ================================
+
+_NULL_SPAN = nullcontext()
+
+
+class NullTracer:
+    """Tracer that records nothing."""
+
+    enabled = False
+
+    def span(self, name: str, **args):
+        return _NULL_SPAN
+
+
+NULL_TRACER = NullTracer()
+
+
+class Tracer:
+    """Collects spans from any thread for one trace file."""
+
+    enabled = True
+
+    def __init__(self, process_name: str = "pose analysis"):
+        self.process_name = process_name
+        self.events = []
+        self._origin_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._thread_names = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Record the time spent in the block; args appear in the event details."""
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end_ns = time.perf_counter_ns()
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": self._pid,
+                "tid": self._thread_id(),
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def _thread_id(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            with self._lock:
+                self._thread_names[tid] = threading.current_thread().name
+        return tid
+
+    def to_dict(self) -> dict:
+        metadata = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self._pid,
+                "args": {"name": self.process_name},
+            }
+        ]
+        with self._lock:
+            thread_names = list(self._thread_names.items())
+        for tid, thread_name in thread_names:
+            metadata.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+        return {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+
+def new_tracer(process_name: str) -> Tracer | NullTracer:
+    """A Tracer for TRACE_SAMPLE_RATE of calls if TRACE_DIR is set, else NULL_TRACER."""
+    if TRACE_DIR is None or random.random() >= TRACE_SAMPLE_RATE:
+        return NULL_TRACER
+    return Tracer(process_name)
+
+
+def _prune_traces(trace_dir: str, keep: int):
+    """Delete all but the `keep` most recently written traces."""
+    paths = glob.glob(os.path.join(trace_dir, "*.json"))
+    if len(paths) <= keep:
+        return
+    by_age = []
+    for path in paths:
+        try:
+            by_age.append((os.path.getmtime(path), path))
+        except OSError:
+            pass  # Removed by a concurrent prune.
+    by_age.sort(reverse=True)
+    for _, path in by_age[keep:]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def save_trace(tracer: Tracer | NullTracer, name: str) -> str | None:
+    """Write a trace to TRACE_DIR as <name>.json; returns the file name, if any.
+
+    Only the newest TRACE_KEEP traces are kept, so a long-running server
+    does not fill the disk.
+    """
+    if not tracer.enabled or TRACE_DIR is None:
+        return None
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    filename = f"{name}.json"
+    tracer.save(os.path.join(TRACE_DIR, filename))
+    _prune_traces(TRACE_DIR, TRACE_KEEP)
+    return filename
@@ -0,0 +1,241 @@
+"""
+Streaming upload handling.
+Request bodies are parsed as they arrive and uploaded videos are written to
+disk chunk by chunk, so memory per upload stays constant regardless of the
+video's size and size limits apply before the whole body has been sent.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple
+
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, MultipartState, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+# ================================
+# Configuration
+# ================================
+
+# Uploaded file data is written to disk in blocks of at least this size,
+# rather than one threadpool hop per (typically 64 KB) ASGI body chunk.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+MAX_UPLOAD_BYTES = int(os.environ.get("POSE_MAX_UPLOAD_MB", 500)) * 1024 * 1024
+
+# Directory for spooled uploads, e.g. /dev/shm to decode from RAM-backed
+# storage. Defaults to the system temp directory.
+SPOOL_DIR = os.environ.get("POSE_SPOOL_DIR") or None
+
+# Total size of the text form fields sent alongside an upload.
+MAX_FORM_BYTES = 64 * 1024
+
+# ================================
+# Upload Spooling
+# ================================
+
+
+class SpooledUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+def _too_large(max_bytes: int, what: str = "Video") -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"{what} exceeds the {max_bytes // (1024 * 1024)} MB upload limit",
+    )
+
+
+def _declared_length(request: Request) -> int | None:
+    try:
+        return int(request.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def read_body(request: Request, max_bytes: int, what: str = "Request body") -> bytes:
+    """Read a request body into memory, rejecting it with 413 past max_bytes.
+
+    A declared Content-Length over the limit is rejected before anything is
+    read; otherwise the limit is checked as chunks arrive.
+    """
+    declared = _declared_length(request)
+    if declared is not None and declared > max_bytes:
+        raise _too_large(max_bytes, what)
+
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise _too_large(max_bytes, what)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class MultipartUpload(NamedTuple):
+    """Text form fields (repeated fields keep every value) and the spooled file."""
+
+    fields: dict[str, list[str]]
+    upload: SpooledUpload
+
+
+class _SpoolFile:
+    """Temp file a file part is written to and hashed on the way.
+
+    Data is buffered and written UPLOAD_CHUNK_SIZE at a time.
+    """
+
+    def __init__(self, filename: str, spool_dir: str | None):
+        suffix = os.path.splitext(filename or "video.mp4")[1] or ".mp4"
+        self._tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=spool_dir)
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self.size = 0
+
+    async def write(self, chunk: bytes):
+        self.size += len(chunk)
+        self._digest.update(chunk)
+        self._buffer += chunk
+        if len(self._buffer) >= UPLOAD_CHUNK_SIZE:
+            await self._flush()
+
+    async def _flush(self):
+        block, self._buffer = self._buffer, bytearray()
+        await run_in_threadpool(self._tmp.write, block)
+
+    async def finish(self) -> SpooledUpload:
+        if self._buffer:
+            await self._flush()
+        self._tmp.close()
+        return SpooledUpload(self._tmp.name, self.size, self._digest.hexdigest())
+
+    def discard(self):
+        self._tmp.close()
+        os.unlink(self._tmp.name)
+
+
+async def spool_multipart(
+    request: Request,
+    file_field: str = "video",
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    spool_dir: str | None = SPOOL_DIR,
+) -> MultipartUpload:
+    """Parse a multipart/form-data body as it arrives, spooling one file to disk.
+
+    An UploadFile has already been received in full, and copied to a temp
+    file, by the time the endpoint runs. Parsing request.stream() here
+    instead applies the limit during the upload: a declared Content-Length
+    over it is rejected before anything is read, and the file part is cut
+    off with 413 as soon as it passes max_bytes. The file is written once,
+    to spool_dir, and removed again if the request fails.
+    """
+    declared = _declared_length(request)
+    if declared is not None and declared > max_bytes + MAX_FORM_BYTES:
+        raise _too_large(max_bytes)
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+
+    # The parser's callbacks only record events; they are applied after each
+    # chunk so file writes can be awaited.
+    events = []
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": lambda: events.append(("begin", b"")),
+            "on_header_field": lambda data, start, end: events.append(
+                ("header_field", data[start:end])
+            ),
+            "on_header_value": lambda data, start, end: events.append(
+                ("header_value", data[start:end])
+            ),
+            "on_header_end": lambda: events.append(("header_end", b"")),
+            "on_headers_finished": lambda: events.append(("headers", b"")),
+            "on_part_data": lambda data, start, end: events.append(
+                ("data", data[start:end])
+            ),
+            "on_part_end": lambda: events.append(("end", b"")),
+        },
+    )
+
+    fields = {}
+    form_bytes = 0
+    spool = None
+    upload = None
+    # State of the part being parsed.
+    header_field = header_value = b""
+    disposition = b""
+    name = None
+    value = bytearray()
+    target = None
+
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError as e:
+                raise HTTPException(
+                    status_code=400, detail=f"Malformed multipart body: {e}"
+                )
+            for event, data in events:
+                if event == "begin":
+                    header_field = header_value = disposition = b""
+                elif event == "header_field":
+                    header_field += data
+                elif event == "header_value":
+                    header_value += data
+                elif event == "header_end":
+                    if header_field.lower() == b"content-disposition":
+                        disposition = header_value
+                    header_field = header_value = b""
+                elif event == "headers":
+                    _, options = parse_options_header(disposition)
+                    name = options.get(b"name", b"").decode("utf-8", "replace")
+                    if b"filename" not in options:
+                        target = "field"
+                        value = bytearray()
+                    elif name == file_field and spool is None and upload is None:
+                        target = "file"
+                        spool = _SpoolFile(
+                            options[b"filename"].decode("utf-8", "replace"), spool_dir
+                        )
+                    else:
+                        raise HTTPException(
+                            status_code=400, detail=f"Unexpected file field: {name}"
+                        )
+                elif event == "data" and target == "file":
+                    if spool.size + len(data) > max_bytes:
+                        raise _too_large(max_bytes)
+                    await spool.write(data)
+                elif event == "data":
+                    form_bytes += len(data)
+                    if form_bytes > MAX_FORM_BYTES:
+                        raise _too_large(MAX_FORM_BYTES, "Form fields")
+                    value += data
+                elif event == "end" and target == "file":
+                    upload = await spool.finish()
+                    spool = None
+                elif event == "end":
+                    fields.setdefault(name, []).append(value.decode("utf-8", "replace"))
+            events.clear()
+
+        parser.finalize()
+        if parser.state != MultipartState.END:
+            raise HTTPException(status_code=400, detail="Incomplete multipart body")
+    except BaseException:
+        if spool is not None:
+            spool.discard()
+        if upload is not None:
+            os.unlink(upload.path)
+        raise
+
+    if upload is None:
+        raise HTTPException(status_code=422, detail=f"Missing file field: {file_field}")
+    return MultipartUpload(fields, upload)
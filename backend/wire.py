@@ -0,0 +1,359 @@
+"""
+Compact binary encoding for scores and landmarks.
+
+A message is MAGIC, a JSON header, then tagged binary sections:
+
+    MAGIC | u32 header length | header JSON | (tag[4] | u32 length | payload)*
+
+Every list of scores in a result is moved out of the JSON into a SCRS
+section as float16 or uint8, and the JSON keeps {"$section": i} in its
+place. Landmarks travel in LMKS sections as int16 fixed-point values,
+delta-encoded from frame to frame and deflated. All integers are
+little-endian.
+"""
+
+import json
+import struct
+import zlib
+
+import numpy as np
+
+# ================================
+# Configuration
+# ================================
+
+MEDIA_TYPE = "application/x-pose-frames"
+MAGIC = b"PWF1"
+
+# int16 units per normalized coordinate: 1e-4 resolution, range +/-3.27.
+LANDMARK_SCALE = 10000
+
+# Score encodings, chosen with the `scores` media type parameter. Missing
+# scores (None) are NaN in float16 and MISSING_UINT8 in uint8.
+SCORE_DTYPES = {"float16": (1, np.float16), "uint8": (2, np.uint8)}
+DEFAULT_SCORE_DTYPE = "float16"
+MISSING_UINT8 = 255
+
+_U32 = struct.Struct("<I")
+_SECTION = struct.Struct("<4sI")
+_SCORES_HEADER = struct.Struct("<BI")
+# frames, channels, scale, has-previous flag
+_LANDMARKS_HEADER = struct.Struct("<IBHB")
+
+SCORES_TAG = b"SCRS"
+LANDMARKS_TAG = b"LMKS"
+
+# Landmark channels a message may carry: x, y and optionally z and
+# visibility, as in the JSON landmark rows.
+LANDMARK_CHANNELS = (2, 3, 4)
+
+
+class WireFormatError(ValueError):
+    """Raised for a message that is not valid in this format."""
+
+
+# ================================
+# Content Negotiation
+# ================================
+
+
+def parse_media_type(header: str | None) -> dict | None:
+    """Parameters of the MEDIA_TYPE entry in an Accept/Content-Type header.
+
+    Returns None if the header does not name MEDIA_TYPE.
+    """
+    for entry in (header or "").split(","):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        if media_type.lower() != MEDIA_TYPE:
+            continue
+        options = {}
+        for param in params:
+            key, _, value = param.partition("=")
+            options[key.strip().lower()] = value.strip().strip('"')
+        return options
+    return None
+
+
+def negotiated_score_dtype(accept: str | None) -> str | None:
+    """Score encoding the client asked for, or None if it wants JSON."""
+    options = parse_media_type(accept)
+    if options is None:
+        return None
+    dtype = options.get("scores", DEFAULT_SCORE_DTYPE)
+    return dtype if dtype in SCORE_DTYPES else DEFAULT_SCORE_DTYPE
+
+
+# ================================
+# Container
+# ================================
+
+
+def pack(header: dict, sections: list[tuple[bytes, bytes]]) -> bytes:
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    parts = [MAGIC, _U32.pack(len(header_bytes)), header_bytes]
+    for tag, payload in sections:
+        parts.append(_SECTION.pack(tag, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def unpack(data: bytes) -> tuple[dict, list[tuple[bytes, bytes]]]:
+    if not data.startswith(MAGIC):
+        raise WireFormatError("Not a pose frames message")
+    try:
+        offset = len(MAGIC)
+        (header_length,) = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        header = json.loads(data[offset : offset + header_length])
+        offset += header_length
+
+        sections = []
+        while offset < len(data):
+            tag, length = _SECTION.unpack_from(data, offset)
+            offset += _SECTION.size
+            if offset + length > len(data):
+                raise WireFormatError("Truncated section")
+            sections.append((tag, data[offset : offset + length]))
+            offset += length
+    except (struct.error, ValueError) as e:
+        raise WireFormatError(f"Malformed message: {e}") from None
+    return header, sections
+
+
+# ================================
+# Scores
+# ================================
+
+
+def encode_scores(scores, dtype: str = DEFAULT_SCORE_DTYPE) -> bytes:
+    code, np_dtype = SCORE_DTYPES[dtype]
+    values = np.array([np.nan if s is None else s for s in scores], dtype=np.float64)
+    if np_dtype is np.uint8:
+        missing = np.isnan(values)
+        values = np.clip(np.rint(np.nan_to_num(values)), 0, 100)
+        values[missing] = MISSING_UINT8
+    encoded = values.astype(np.dtype(np_dtype).newbyteorder("<"))
+    return _SCORES_HEADER.pack(code, len(values)) + encoded.tobytes()
+
+
+def decode_scores(payload: bytes) -> np.ndarray:
+    """float32 scores, with NaN where a score was missing."""
+    code, count = _SCORES_HEADER.unpack_from(payload)
+    for np_code, np_dtype in SCORE_DTYPES.values():
+        if np_code == code:
+            dtype = np.dtype(np_dtype).newbyteorder("<")
+            raw = np.frombuffer(
+                payload, dtype=dtype, count=count, offset=_SCORES_HEADER.size
+            )
+            values = raw.astype(np.float32)
+            if np_dtype is np.uint8:
+                values[raw == MISSING_UINT8] = np.nan
+            return values
+    raise WireFormatError(f"Unknown score encoding {code}")
+
+
+def _is_score_list(key, value) -> bool:
+    return (
+        key == "scores"
+        and isinstance(value, list)
+        and all(v is None or isinstance(v, (int, float)) for v in value)
+    )
+
+
+def encode_result(result: dict, score_dtype: str = DEFAULT_SCORE_DTYPE) -> bytes:
+    """Encode a JSON-style result, moving every `scores` list into a section."""
+    sections = []
+
+    def strip(value):
+        if isinstance(value, dict):
+            out = {}
+            for key, item in value.items():
+                if _is_score_list(key, item):
+                    out[key] = {"$section": len(sections)}
+                    sections.append((SCORES_TAG, encode_scores(item, score_dtype)))
+                else:
+                    out[key] = strip(item)
+            return out
+        if isinstance(value, list):
+            return [strip(item) for item in value]
+        return value
+
+    return pack(strip(result), sections)
+
+
+def decode_result(data: bytes) -> dict:
+    """Inverse of encode_result; scores come back as lists of floats or None."""
+    header, sections = unpack(data)
+
+    def restore(value):
+        if isinstance(value, dict):
+            if set(value) == {"$section"}:
+                tag, payload = sections[value["$section"]]
+                return [
+                    None if np.isnan(score) else score
+                    for score in decode_scores(payload).tolist()
+                ]
+            return {key: restore(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [restore(item) for item in value]
+        return value
+
+    return restore(header)
+
+
+# ================================
+# Landmarks
+# ================================
+
+
+def quantize_landmarks(landmarks: np.ndarray) -> np.ndarray:
+    """Normalized float landmarks to int16 fixed point."""
+    scaled = np.rint(np.asarray(landmarks, dtype=np.float64) * LANDMARK_SCALE)
+    return np.clip(scaled, -32768, 32767).astype(np.int16)
+
+
+def encode_landmarks(
+    landmarks: np.ndarray, valid: np.ndarray, previous: np.ndarray | None = None
+) -> bytes:
+    """Encode (frames, 33, channels) landmarks and their validity bitmap.
+
+    Valid frames are quantized and each is stored as its difference from
+    the previous valid frame (the first from `previous`, a quantized frame
+    from an earlier message, if given). Small differences deflate well.
+    """
+    landmarks = np.asarray(landmarks)
+    valid = np.asarray(valid, dtype=bool)
+    frames, _, channels = landmarks.shape
+    if channels not in LANDMARK_CHANNELS:
+        raise ValueError(
+            f"Landmarks must have {LANDMARK_CHANNELS} channels, got {channels}"
+        )
+
+    quantized = quantize_landmarks(landmarks[valid])
+    base = np.zeros((1, 33, channels), dtype=np.int16)
+    if previous is not None:
+        base = previous.reshape(1, 33, channels)
+    # int16 arithmetic wraps, and decoding wraps back the same way.
+    with np.errstate(over="ignore"):
+        deltas = np.diff(np.concatenate([base, quantized]), axis=0).astype("<i2")
+
+    header = _LANDMARKS_HEADER.pack(
+        frames, channels, LANDMARK_SCALE, previous is not None
+    )
+    return (
+        header
+        + np.packbits(valid, bitorder="little").tobytes()
+        + zlib.compress(deltas.tobytes())
+    )
+
+
+def _read_landmarks_header(payload: bytes) -> tuple[int, int, int, bool]:
+    """frames, channels, scale and has-previous flag, checked for sanity."""
+    try:
+        frames, channels, scale, has_previous = _LANDMARKS_HEADER.unpack_from(payload)
+    except struct.error as e:
+        raise WireFormatError(f"Malformed landmarks: {e}") from None
+    if channels not in LANDMARK_CHANNELS:
+        raise WireFormatError(
+            f"Landmarks must have {LANDMARK_CHANNELS} channels, got {channels}"
+        )
+    if scale <= 0:
+        raise WireFormatError("Landmark scale must be positive")
+    return frames, channels, scale, bool(has_previous)
+
+
+def landmark_frame_count(payload: bytes) -> int:
+    """Frames an LMKS section declares, read from its header alone."""
+    return _read_landmarks_header(payload)[0]
+
+
+def _inflate(data: bytes, expected_length: int) -> bytes:
+    """Decompress exactly expected_length bytes, never inflating more."""
+    inflater = zlib.decompressobj()
+    # One byte over the expected length is enough to detect excess data.
+    output = inflater.decompress(data, expected_length + 1)
+    if len(output) != expected_length or not inflater.eof or inflater.unused_data:
+        raise WireFormatError("Landmark data does not match its header")
+    return output
+
+
+def _decode_quantized(
+    payload: bytes, previous: np.ndarray | None, max_frames: int | None = None
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """int16 landmarks of the valid frames, the validity bitmap and the scale.
+
+    The header is checked, against max_frames too, before anything sized
+    from it is allocated or decompressed.
+    """
+    frames, channels, scale, has_previous = _read_landmarks_header(payload)
+    if max_frames is not None and frames > max_frames:
+        raise WireFormatError(f"Landmarks have {frames} frames, more than {max_frames}")
+    try:
+        offset = _LANDMARKS_HEADER.size
+        bitmap_bytes = (frames + 7) // 8
+        valid = np.unpackbits(
+            np.frombuffer(payload, np.uint8, bitmap_bytes, offset),
+            count=frames,
+            bitorder="little",
+        ).astype(bool)
+        valid_frames = int(valid.sum())
+        data = _inflate(payload[offset + bitmap_bytes :], valid_frames * 33 * channels * 2)
+        deltas = np.frombuffer(data, dtype="<i2").reshape(valid_frames, 33, channels)
+    except WireFormatError:
+        raise
+    except (ValueError, zlib.error) as e:
+        raise WireFormatError(f"Malformed landmarks: {e}") from None
+
+    if has_previous and previous is None:
+        raise WireFormatError("Landmarks are relative to a frame that was not given")
+    if has_previous and previous.size != 33 * channels:
+        raise WireFormatError("Landmarks are relative to a frame of another shape")
+    base = previous if has_previous else np.zeros((33, channels), dtype=np.int16)
+
+    quantized = np.cumsum(
+        np.concatenate([base.reshape(1, 33, channels), deltas]), axis=0, dtype=np.int16
+    )[1:]
+    return quantized, valid, scale
+
+
+def decode_landmarks(
+    payload: bytes, previous: np.ndarray | None = None, max_frames: int | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Inverse of encode_landmarks: float32 (frames, 33, channels) and valid.
+
+    Raises WireFormatError for a malformed payload or one declaring more
+    than max_frames frames.
+    """
+    quantized, valid, scale = _decode_quantized(payload, previous, max_frames)
+    landmarks = np.zeros((len(valid),) + quantized.shape[1:], dtype=np.float32)
+    landmarks[valid] = quantized.astype(np.float32) / scale
+    return landmarks, valid
+
+
+class LandmarkStreamEncoder:
+    """Encodes one frame per message, each relative to the last one sent."""
+
+    def __init__(self):
+        self._previous = None
+
+    def encode(self, landmarks: np.ndarray | None) -> bytes:
+        if landmarks is None:
+            return encode_landmarks(np.zeros((1, 33, 4)), np.zeros(1, dtype=bool))
+        landmarks = np.asarray(landmarks)[None]
+        payload = encode_landmarks(landmarks, np.ones(1, dtype=bool), self._previous)
+        self._previous = quantize_landmarks(landmarks[0])
+        return payload
+
+
+class LandmarkStreamDecoder:
+    """Client-side counterpart of LandmarkStreamEncoder."""
+
+    def __init__(self):
+        self._previous = None
+
+    def decode(self, payload: bytes) -> np.ndarray | None:
+        quantized, valid, scale = _decode_quantized(payload, self._previous, max_frames=1)
+        if not valid[0]:
+            return None
+        self._previous = quantized[0]
+        return quantized[0].astype(np.float32) / scale
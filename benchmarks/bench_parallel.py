@@ -0,0 +1,87 @@
+"""
+Serial vs multi-process video analysis.
+
+Usage:
+    python -m benchmarks.bench_parallel path/to/video.mp4 [--workers 16]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from backend.parallel import (
+    PARALLEL_SCORE_TOLERANCE,
+    SEGMENT_WARMUP_FRAMES,
+    ParallelAnalyzer,
+    split_segments,
+)
+from backend.pose_scoring import (
+    DEFAULT_PROFILE,
+    POSE_OPTIONS,
+    load_pose_landmarker,
+    load_reference_pose,
+    process_video,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("video")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pose", default=next(iter(POSE_OPTIONS)))
+    args = parser.parse_args()
+
+    reference_angles = load_reference_pose(args.pose)
+
+    # Both timed runs include building their landmarkers: the serial run
+    # loads one, and every parallel segment loads its own.
+    start = time.perf_counter()
+    load_pose_landmarker(DEFAULT_PROFILE).close()
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    serial_scores, _ = process_video(args.video, reference_angles)
+    serial_time = time.perf_counter() - start
+
+    analyzer = ParallelAnalyzer(args.workers)
+    try:
+        # Start the worker processes and their imports, a one-off server cost.
+        analyzer.process_video(args.video, reference_angles)
+        start = time.perf_counter()
+        parallel_scores, _ = analyzer.process_video(args.video, reference_angles)
+        parallel_time = time.perf_counter() - start
+    finally:
+        analyzer.close()
+
+    frames = len(serial_scores)
+    segments = split_segments(frames, args.workers)
+    print(f"frames:   {frames} serial / {len(parallel_scores)} parallel, "
+          f"{len(segments)} segments")
+    print(f"model:    {load_time:.2f}s per landmarker build")
+    print(f"serial:   {serial_time:.2f}s ({frames / serial_time:.1f} fps)")
+    print(f"parallel: {parallel_time:.2f}s ({frames / parallel_time:.1f} fps), "
+          f"{args.workers} workers")
+    print(f"speedup:  {serial_time / parallel_time:.2f}x")
+
+    if len(parallel_scores) == frames and frames:
+        # Differences come from tracking restarting at segment boundaries,
+        # so frames just after a boundary are reported separately.
+        diff = np.abs(np.array(serial_scores) - np.array(parallel_scores))
+        near_boundary = np.zeros(frames, dtype=bool)
+        for start, _ in segments[1:]:
+            near_boundary[start:start + SEGMENT_WARMUP_FRAMES] = True
+        within = (diff <= PARALLEL_SCORE_TOLERANCE).mean()
+        print(f"|score diff|: max {diff.max():.3f}, "
+              f"p99 {np.percentile(diff, 99):.3f}, mean {diff.mean():.3f}, "
+              f"{within:.1%} of frames within tolerance {PARALLEL_SCORE_TOLERANCE:g}")
+        for label, mask in (("after a boundary", near_boundary),
+                            ("elsewhere", ~near_boundary)):
+            if mask.any():
+                print(f"  {label}: max {diff[mask].max():.3f} "
+                      f"over {mask.sum()} frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Inference throughput and score drift for each inference profile.
+
+Profiles whose model file is missing are skipped.
+
+Usage:
+    python -m benchmarks.bench_profiles path/to/video.mp4 [--profiles lite full heavy]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from backend.pose_scoring import (
+    DEFAULT_PROFILE,
+    INFERENCE_PROFILES,
+    POSE_OPTIONS,
+    load_pose_landmarker,
+    load_reference_pose,
+    process_video,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("video")
+    parser.add_argument("--profiles", nargs="+", default=list(INFERENCE_PROFILES))
+    parser.add_argument("--baseline", default=DEFAULT_PROFILE)
+    parser.add_argument("--pose", default=next(iter(POSE_OPTIONS)))
+    args = parser.parse_args()
+
+    reference_angles = load_reference_pose(args.pose)
+
+    results = {}
+    for name in dict.fromkeys([args.baseline, *args.profiles]):
+        if not os.path.exists(INFERENCE_PROFILES[name].model_path):
+            print(f"skipping {name}: {INFERENCE_PROFILES[name].model_asset} not found")
+            continue
+        # Model loading is timed on its own so fps is inference throughput.
+        start = time.perf_counter()
+        landmarker = load_pose_landmarker(name)
+        load_time = time.perf_counter() - start
+        try:
+            start = time.perf_counter()
+            scores, _ = process_video(
+                args.video, reference_angles, landmarker, profile=name
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            landmarker.close()
+        results[name] = (np.array(scores), elapsed, load_time)
+
+    baseline = results.get(args.baseline)
+
+    print(f"{'profile':>20} {'load s':>7} {'fps':>8} {'mean drift':>11} {'max drift':>10}")
+    for name, (scores, elapsed, load_time) in results.items():
+        if baseline is None:
+            drift = np.full(1, np.nan)
+        else:
+            drift = np.abs(scores - baseline[0])
+        print(f"{name:>20} {load_time:7.2f} {len(scores) / elapsed:8.1f} "
+              f"{drift.mean():11.2f} {drift.max():10.2f}")
+
+
+if __name__ == "__main__":
+    main()
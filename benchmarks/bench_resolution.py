@@ -0,0 +1,63 @@
+"""
+Inference throughput and score drift at several maximum resolutions.
+
+Usage:
+    python -m benchmarks.bench_resolution path/to/video.mp4 [--sides 1280 960 640]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.pose_scoring import (
+    POSE_OPTIONS,
+    load_pose_landmarker,
+    load_reference_pose,
+    process_video,
+)
+
+DEFAULT_SIDES = [1920, 1280, 960, 640, 480, 320]
+
+
+def timed_run(video_path: str, reference_angles: dict, max_side: int | None):
+    """Score a video at one max_side, returning (scores, seconds).
+
+    Each run gets a fresh landmarker, built before the clock starts so
+    model loading is not counted in its throughput.
+    """
+    landmarker = load_pose_landmarker()
+    try:
+        start = time.perf_counter()
+        scores, _ = process_video(video_path, reference_angles, landmarker,
+                                  max_side=max_side)
+        return np.array(scores), time.perf_counter() - start
+    finally:
+        landmarker.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("video")
+    parser.add_argument("--sides", type=int, nargs="+", default=DEFAULT_SIDES)
+    parser.add_argument("--pose", default=next(iter(POSE_OPTIONS)))
+    args = parser.parse_args()
+
+    reference_angles = load_reference_pose(args.pose)
+
+    baseline, baseline_time = timed_run(args.video, reference_angles, None)
+
+    print(f"{'max side':>9} {'fps':>8} {'speedup':>8} {'mean drift':>11} {'max drift':>10}")
+    print(f"{'full':>9} {len(baseline) / baseline_time:8.1f} {1.0:8.2f} "
+          f"{0.0:11.2f} {0.0:10.2f}")
+
+    for side in args.sides:
+        scores, elapsed = timed_run(args.video, reference_angles, side)
+
+        drift = np.abs(scores - baseline)
+        print(f"{side:>9} {len(scores) / elapsed:8.1f} {baseline_time / elapsed:8.2f} "
+              f"{drift.mean():11.2f} {drift.max():10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Vectorized scoring time versus the per-frame scoring loop.
+
+The loop baseline is score_landmarks_xy, which scores one frame with the
+scalar functions (normalize_landmarks, extract_joint_angles, compute_mae,
+mae_to_score). The "1-row" column sends each frame through
+score_landmark_array alone, which is slower and is why single frames keep
+the scalar path.
+
+Landmarks are synthetic: a reference pose plus noise, so no video or model
+file is needed.
+
+Usage:
+    python -m benchmarks.bench_scoring [--minutes 10] [--fps 30]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.pose_scoring import (
+    ALL_JOINTS,
+    POSE_OPTIONS,
+    SCORED_JOINTS,
+    load_reference_pose,
+    score_landmark_array,
+    score_landmarks_xy,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--pose", default=next(iter(POSE_OPTIONS)))
+    parser.add_argument("--loop-frames", type=int, default=2000,
+                        help="frames timed with the per-frame loops (extrapolated)")
+    args = parser.parse_args()
+
+    reference_angles = load_reference_pose(args.pose)
+    frames = int(args.minutes * 60 * args.fps)
+
+    rng = np.random.default_rng(0)
+    base = rng.random((33, 2))
+    xy = base[None] + rng.normal(0.0, 0.02, (frames, 33, 2))
+    valid = rng.random(frames) > 0.05
+
+    print(f"{frames} frames ({args.minutes:g} min at {args.fps:g} fps)")
+    print(f"{'joints':>7} {'vectorized ms':>14} {'scalar loop ms':>15} "
+          f"{'1-row loop ms':>14} {'speedup':>8}")
+
+    for joints in (SCORED_JOINTS, ALL_JOINTS):
+        start = time.perf_counter()
+        score_landmark_array(xy, reference_angles, valid, joints)
+        vectorized = time.perf_counter() - start
+
+        # Both loops are timed on a sample and extrapolated to every frame.
+        sample = min(frames, args.loop_frames)
+        start = time.perf_counter()
+        for i in range(sample):
+            if valid[i]:
+                score_landmarks_xy(xy[i], reference_angles, joints)
+        loop = (time.perf_counter() - start) * frames / max(sample, 1)
+
+        start = time.perf_counter()
+        for i in range(sample):
+            if valid[i]:
+                score_landmark_array(xy[i : i + 1], reference_angles, joints=joints)
+        row_loop = (time.perf_counter() - start) * frames / max(sample, 1)
+
+        print(f"{len(joints):>7} {vectorized * 1000:14.1f} {loop * 1000:15.1f} "
+              f"{row_loop * 1000:14.1f} {loop / vectorized:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
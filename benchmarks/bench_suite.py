@@ -0,0 +1,443 @@
+"""
+Offline benchmark suite for the analysis hot paths.
+
+Covers process_video end to end, the Phase 2 scoring functions, every
+classify_* function in pose_utils and the Streamlit app's
+generate_output_video. Videos are generated with cv2.VideoWriter, and a
+ReplayDetector stands in for MediaPipe when the profile's .task model
+file is missing, so the suite needs no model or footage.
+
+Each group of cases runs in a fresh process so its peak memory can be
+reported. Results (frames/sec, per-frame latency percentiles, peak RSS)
+are written as JSON; --compare prints throughput against an earlier run.
+
+Usage:
+    python -m benchmarks.bench_suite [--frames 300] [--groups scoring classify]
+        [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import importlib.util
+import inspect
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+import pose_utils
+from backend.pose_scoring import (
+    ALL_JOINTS,
+    DEFAULT_PROFILE,
+    INFERENCE_PROFILES,
+    POSE_OPTIONS,
+    LandmarkSequence,
+    load_reference_pose,
+    process_video,
+    score_all_poses,
+    score_landmark_array,
+    score_landmarks_xy,
+)
+from backend.detectors import create_detector
+from backend.tracing import Tracer
+from benchmarks.synthetic import make_synthetic_video, replayed_landmarks
+
+GROUPS = ["process_video", "scoring", "classify", "output_video"]
+
+STREAMLIT_APP = os.path.join(os.path.dirname(__file__), "..", "streamlit", "app.py")
+
+# Repeats for cases that finish a whole sequence in well under a second.
+VECTORIZED_REPEATS = 20
+
+# ================================
+# Measurement
+# ================================
+
+
+def _summarize(name: str, frames: int, elapsed_s: float, latencies_s, **extra) -> dict:
+    latencies_ms = np.asarray(latencies_s, dtype=np.float64) * 1000
+    if len(latencies_ms) == 0:
+        latencies_ms = np.zeros(1)
+    return {
+        "name": name,
+        "frames": int(frames),
+        "seconds": round(elapsed_s, 6),
+        "fps": round(frames / elapsed_s, 2) if elapsed_s > 0 else None,
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies_ms, 50)), 4),
+            "p90": round(float(np.percentile(latencies_ms, 90)), 4),
+            "p99": round(float(np.percentile(latencies_ms, 99)), 4),
+            "max": round(float(latencies_ms.max()), 4),
+        },
+        **extra,
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _landmarker(detector: str, profile: str, fps: float):
+    """A MediaPipe detector if requested and available, else a replay one."""
+    model_path = INFERENCE_PROFILES[profile].model_path
+    if detector == "mediapipe" or (detector == "auto" and os.path.exists(model_path)):
+        return create_detector("mediapipe", model_path), f"mediapipe:{profile}"
+    return create_detector("replay", fps=fps, miss_every=10), "replay"
+
+
+# ================================
+# Cases
+# ================================
+
+
+def _bench_process_video(config: dict, workdir: str) -> list[dict]:
+    reference_angles = load_reference_pose(next(iter(POSE_OPTIONS)))
+    results = []
+    for width, height in config["sizes"]:
+        video = make_synthetic_video(
+            os.path.join(workdir, f"synthetic_{width}x{height}.mp4"),
+            config["frames"],
+            config["fps"],
+            (width, height),
+        )
+        landmarker, detector = _landmarker(
+            config["detector"], config["profile"], config["fps"]
+        )
+        completed = []
+        start = time.perf_counter()
+        scores, _ = process_video(
+            video,
+            reference_angles,
+            landmarker,
+            progress_callback=lambda done, total: completed.append(time.perf_counter()),
+        )
+        elapsed = time.perf_counter() - start
+        landmarker.close()
+
+        # Time between consecutive frames leaving inference.
+        latencies = np.diff([start] + completed)
+        results.append(
+            _summarize(
+                f"process_video[{width}x{height}]",
+                len(scores),
+                elapsed,
+                latencies,
+                detector=detector,
+            )
+        )
+    return results
+
+
+def _bench_scoring(config: dict, workdir: str) -> list[dict]:
+    frames = config["frames"]
+    landmarks, valid = replayed_landmarks(frames, config["fps"])
+    xy = landmarks[:, :, :2].astype(np.float64)
+    reference_angles = load_reference_pose(next(iter(POSE_OPTIONS)))
+    results = []
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(frames):
+        frame_start = time.perf_counter()
+        if valid[i]:
+            score_landmarks_xy(xy[i], reference_angles)
+        latencies.append(time.perf_counter() - frame_start)
+    results.append(
+        _summarize(
+            "score_landmarks_xy[per frame]", frames, time.perf_counter() - start, latencies
+        )
+    )
+
+    for label, joints in (("legs", None), ("full_body", ALL_JOINTS)):
+        kwargs = {} if joints is None else {"joints": joints}
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(VECTORIZED_REPEATS):
+            call_start = time.perf_counter()
+            score_landmark_array(xy, reference_angles, valid, **kwargs)
+            latencies.append((time.perf_counter() - call_start) / frames)
+        results.append(
+            _summarize(
+                f"score_landmark_array[{label}]",
+                frames * VECTORIZED_REPEATS,
+                time.perf_counter() - start,
+                latencies,
+            )
+        )
+
+    sequence = LandmarkSequence(
+        landmarks, valid, config["fps"], np.arange(frames, dtype=np.int32), frames
+    )
+    pose_names = list(POSE_OPTIONS)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(VECTORIZED_REPEATS):
+        call_start = time.perf_counter()
+        score_all_poses(sequence, pose_names)
+        latencies.append((time.perf_counter() - call_start) / frames)
+    results.append(
+        _summarize(
+            f"score_all_poses[{len(pose_names)} poses]",
+            frames * VECTORIZED_REPEATS,
+            time.perf_counter() - start,
+            latencies,
+        )
+    )
+    return results
+
+
+def classify_arguments(landmarks) -> dict:
+    """Every named input the pose_utils classifiers take, from 33 (x, y) points."""
+
+    def point(idx):
+        return [float(landmarks[idx][0]), float(landmarks[idx][1])]
+
+    shoulder_l, elbow_l, wrist_l = point(11), point(13), point(15)
+    shoulder_r, elbow_r, wrist_r = point(12), point(14), point(16)
+    hip_l, knee_l, ankle_l = point(23), point(25), point(27)
+    hip_r, knee_r, ankle_r = point(24), point(26), point(28)
+    angle = pose_utils.calculate_angle
+
+    return {
+        "landmarks": [point(i) for i in range(33)],
+        "left_arm_angle": angle(shoulder_l, elbow_l, wrist_l),
+        "right_arm_angle": angle(shoulder_r, elbow_r, wrist_r),
+        "left_leg_angle": angle(hip_l, knee_l, ankle_l),
+        "right_leg_angle": angle(hip_r, knee_r, ankle_r),
+        "left_shoulder_angle": angle(hip_l, shoulder_l, wrist_l),
+        "right_shoulder_angle": angle(hip_r, shoulder_r, wrist_r),
+        "left_body_angle": angle(shoulder_l, hip_l, knee_l),
+        "right_body_angle": angle(shoulder_r, hip_r, knee_r),
+        "left_shoulder": shoulder_l,
+        "right_shoulder": shoulder_r,
+        "left_wrist": wrist_l,
+        "right_wrist": wrist_r,
+        "left_hip": hip_l,
+        "right_hip": hip_r,
+        "left_knee": knee_l,
+        "right_knee": knee_r,
+        "left_ankle": ankle_l,
+        "right_ankle": ankle_r,
+        "shoulder_l": shoulder_l,
+        "shoulder_r": shoulder_r,
+        "hip_l": hip_l,
+        "hip_r": hip_r,
+        "ankle_l": ankle_l,
+        "ankle_r": ankle_r,
+    }
+
+
+def classifier_functions() -> dict:
+    """Every classify_* function defined in pose_utils, by name."""
+    return {
+        name: fn
+        for name, fn in inspect.getmembers(pose_utils, inspect.isfunction)
+        if name.startswith("classify_") and fn.__module__ == pose_utils.__name__
+    }
+
+
+def _bench_classify(config: dict, workdir: str) -> list[dict]:
+    landmarks, valid = replayed_landmarks(config["frames"], config["fps"])
+    inputs = [classify_arguments(frame[:, :2]) for frame in landmarks[valid]]
+    results = []
+    for name, fn in classifier_functions().items():
+        params = list(inspect.signature(fn).parameters)
+        calls = [{p: args[p] for p in params if p in args} for args in inputs]
+        latencies = []
+        start = time.perf_counter()
+        for kwargs in calls:
+            call_start = time.perf_counter()
+            fn(**kwargs)
+            latencies.append(time.perf_counter() - call_start)
+        results.append(
+            _summarize(name, len(calls), time.perf_counter() - start, latencies)
+        )
+    return results
+
+
+def _load_streamlit_app():
+    spec = importlib.util.spec_from_file_location("streamlit_app", STREAMLIT_APP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _bench_output_video(config: dict, workdir: str) -> list[dict]:
+    try:
+        app = _load_streamlit_app()
+    except ImportError as e:
+        print(f"skipping output_video: {e}")
+        return []
+
+    results = []
+    for width, height in config["sizes"]:
+        video = make_synthetic_video(
+            os.path.join(workdir, f"synthetic_{width}x{height}.mp4"),
+            config["frames"],
+            config["fps"],
+            (width, height),
+        )
+        landmarks, valid = replayed_landmarks(config["frames"], config["fps"])
+        scores = np.where(valid, 75.0, 0.0).tolist()
+        tracer = Tracer("output video")
+
+        start = time.perf_counter()
+        app.generate_output_video(
+            video,
+            os.path.join(workdir, f"output_{width}x{height}.mp4"),
+            landmarks,
+            valid,
+            scores,
+            tracer,
+        )
+        elapsed = time.perf_counter() - start
+
+        # Read, overlay and encode time per frame, from the trace spans.
+        per_frame = defaultdict(float)
+        for event in tracer.events:
+            per_frame[event["args"]["frame"]] += event["dur"] / 1e6
+        results.append(
+            _summarize(
+                f"generate_output_video[{width}x{height}]",
+                config["frames"],
+                elapsed,
+                list(per_frame.values()),
+            )
+        )
+    return results
+
+
+CASES = {
+    "process_video": _bench_process_video,
+    "scoring": _bench_scoring,
+    "classify": _bench_classify,
+    "output_video": _bench_output_video,
+}
+
+# ================================
+# Runner
+# ================================
+
+
+def run_group(group: str, config: dict) -> list[dict]:
+    """Run one group of cases; peak RSS covers imports plus the group's work."""
+    base_rss = _peak_rss_mb()
+    with tempfile.TemporaryDirectory(prefix="pose_bench_") as workdir:
+        results = CASES[group](config, workdir)
+    peak_rss = _peak_rss_mb()
+    for result in results:
+        result["group"] = group
+        result["peak_rss_mb"] = round(peak_rss, 1)
+        result["rss_growth_mb"] = round(peak_rss - base_rss, 1)
+    return results
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+def _print_results(results: list[dict], baseline: dict | None):
+    header = f"{'case':<42} {'fps':>11} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}"
+    if baseline is not None:
+        header += f" {'vs base':>8}"
+    print(header)
+    for result in results:
+        latency = result["latency_ms"]
+        line = (
+            f"{result['name']:<42} {result['fps'] or 0:11.1f} "
+            f"{latency['p50']:9.3f} {latency['p99']:9.3f} {result['peak_rss_mb']:8.1f}"
+        )
+        if baseline is not None:
+            before = baseline.get(result["name"])
+            if before and before.get("fps") and result["fps"]:
+                line += f" {result['fps'] / before['fps']:7.2f}x"
+            else:
+                line += f" {'-':>8}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--sizes", nargs="+", default=["640x480", "1280x720"],
+                        help="synthetic video sizes as WIDTHxHEIGHT")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--detector", choices=["auto", "replay", "mediapipe"],
+                        default="auto",
+                        help="auto replays recorded landmarks if the model is missing")
+    parser.add_argument("--profile", choices=list(INFERENCE_PROFILES),
+                        default=DEFAULT_PROFILE)
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--compare", default=None,
+                        help="earlier --output file to compare throughput with")
+    parser.add_argument("--in-process", action="store_true",
+                        help="run every group here (peak memory is then cumulative)")
+    args = parser.parse_args()
+
+    config = {
+        "frames": args.frames,
+        "fps": args.fps,
+        "sizes": [tuple(int(v) for v in size.lower().split("x")) for size in args.sizes],
+        "detector": args.detector,
+        "profile": args.profile,
+    }
+
+    results = []
+    for group in args.groups:
+        if args.in_process:
+            results.extend(run_group(group, config))
+            continue
+        # spawn, so each group starts from a clean process and its own peak RSS.
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results.extend(executor.submit(run_group, group, config).result())
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r["name"]: r for r in json.load(f)["results"]}
+    _print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"environment": _environment(), "config": config, "results": results},
+                f,
+                indent=2,
+            )
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Synthetic inputs for offline benchmarks: generated videos and replayed landmarks.
+"""
+
+import cv2
+import numpy as np
+
+from backend.replay import ReplayDetector
+
+
+def make_synthetic_video(
+    path: str,
+    frames: int = 300,
+    fps: float = 30.0,
+    size: tuple[int, int] = (640, 480),
+) -> str:
+    """Write an mp4v video of a moving figure over a noisy gradient.
+
+    Every frame differs, so decoding costs about what real footage does.
+    """
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a video writer for {path}")
+
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(40, 200, width, dtype=np.float32)[None, :, None]
+    background = np.broadcast_to(gradient, (height, width, 3)).astype(np.uint8)
+    try:
+        for i in range(frames):
+            frame = background.copy()
+            frame += rng.integers(0, 16, frame.shape, dtype=np.uint8)
+            cx = int(width * (0.3 + 0.4 * (i % 60) / 60))
+            cy = height // 2
+            cv2.circle(frame, (cx, cy - height // 4), height // 14, (220, 190, 160), -1)
+            cv2.rectangle(
+                frame,
+                (cx - width // 20, cy - height // 6),
+                (cx + width // 20, cy + height // 5),
+                (90, 60, 200),
+                -1,
+            )
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def replayed_landmarks(frames: int, fps: float = 30.0, miss_every: int = 10):
+    """(landmarks, valid) arrays as a ReplayDetector would produce them.
+
+    landmarks is float32 (frames, 33, 4); valid marks frames with a pose.
+    """
+    detector = ReplayDetector(fps=fps, miss_every=miss_every)
+    landmarks = np.zeros((frames, 33, 4), dtype=np.float32)
+    valid = np.zeros(frames, dtype=bool)
+    for i in range(frames):
+        pose = detector.landmarks_at(i)
+        if pose is not None:
+            landmarks[i] = pose
+            valid[i] = True
+    return landmarks, valid
@@ -1,11 +1,10 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 import os
 import glob
 import json
-from mediapipe.tasks.python import vision
-from mediapipe.tasks import python
+
+from backend.detectors import DetectorMode, create_detector
 
 # --- CONFIGURATION ---
 # Folder structure: 
@@ -21,14 +20,10 @@ WARRIOR1_POSE_NUMBER = [14, 17, 19, 24, 27, 28, 36, 38, 40, 41]
 WARRIOR2_POSE_NUMBER = [1, 11, 12, 14, 17, 2, 21, 23, 27, 3]
 WARRIOR2_POSE_NUMBER = [1, 11, 12, 14, 17, 2, 21, 23, 27, 3]
 
-base_options = mp.tasks.BaseOptions(
-    model_asset_path='pose_landmarker.task'
-)
-options = mp.tasks.vision.PoseLandmarkerOptions(
-    base_options=base_options,
-    running_mode=vision.RunningMode.IMAGE,
+pose = create_detector(
+    model_path='pose_landmarker.task',
+    mode=DetectorMode.IMAGE,
     output_segmentation_masks=True)
-pose = mp.tasks.vision.PoseLandmarker.create_from_options(options)
 
 def calculate_angle(a, b, c):
     """Calculates angle ABC (B is the vertex). Returns degrees."""
@@ -88,15 +83,11 @@ def process_pose_folder(folder_path):
         if image is None: continue
         
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(
-            image_format=mp.ImageFormat.SRGB,
-            data=image_rgb
-        )
-        results = pose.detect(mp_image)
-
-        if results.pose_landmarks:
-            lm = results.pose_landmarks[0]
-            def get_xy(idx): return [lm[idx].x, lm[idx].y]
+        results = pose.detect(image_rgb)
+
+        if results.landmarks is not None:
+            lm = results.landmarks
+            def get_xy(idx): return [lm[idx][0], lm[idx][1]]
 
             # --- MP INDICES ---
             # 11,12=Shoulders | 13,14=Elbows | 15,16=Wrists
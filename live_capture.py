@@ -0,0 +1,270 @@
+"""
+Threaded live loop for the webcam classifiers (main.py, main_refined.py).
+A capture thread reads the camera continuously and hands each frame to a
+LIVE_STREAM detector with detect_async, dropping frames that arrive while
+the previous one is still being detected. Results come back through the
+detector's callback, and the main thread classifies, draws and displays
+the newest one. The camera's driver buffer never fills up, so lag stays at
+about one inference instead of growing, and the overlay shows the
+measured capture-to-display latency and frame rates.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, NamedTuple
+
+import cv2
+import numpy as np
+
+from backend.detectors import Detection, DetectorMode, PoseDetector, create_detector
+
+# ================================
+# Configuration
+# ================================
+
+WINDOW_NAME = "MediaPipe Pose Landmark"
+
+# Seconds of frame times a RateMeter averages over.
+RATE_WINDOW_S = 1.0
+
+# Weight of the newest sample in the displayed latency average.
+LATENCY_SMOOTHING = 0.1
+
+# A frame whose result has not arrived after this long is given up on, so
+# a result the detector never delivers cannot stall the loop.
+RESULT_TIMEOUT_S = 1.0
+
+# ================================
+# Frames and Mailboxes
+# ================================
+
+
+class CapturedFrame(NamedTuple):
+    """One camera frame and when it was read (time.perf_counter())."""
+
+    frame_id: int
+    captured_at: float
+    image: np.ndarray
+
+
+class LiveResult(NamedTuple):
+    """A captured frame, converted to RGB, with its detection."""
+
+    frame: CapturedFrame
+    rgb: np.ndarray
+    detection: Detection
+
+
+class LatestSlot:
+    """Thread-safe single-slot mailbox: a new item replaces one not yet taken."""
+
+    def __init__(self):
+        self._item = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._condition:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def get(self, timeout: float | None = None):
+        """Take the newest item; None once closed, or if timeout passes first."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._item is not None or self._closed, timeout
+            )
+            item, self._item = self._item, None
+            return item
+
+
+class RateMeter:
+    """Events per second over the last RATE_WINDOW_S seconds."""
+
+    def __init__(self, window_s: float = RATE_WINDOW_S):
+        self._window_s = window_s
+        self._times = deque()
+        self._lock = threading.Lock()
+
+    def tick(self, now: float | None = None):
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            self._times.append(now)
+            while now - self._times[0] > self._window_s:
+                self._times.popleft()
+
+    @property
+    def rate(self) -> float:
+        with self._lock:
+            if len(self._times) < 2:
+                return 0.0
+            span = self._times[-1] - self._times[0]
+            return (len(self._times) - 1) / span if span > 0 else 0.0
+
+
+# ================================
+# Threads
+# ================================
+
+
+class StreamingInference:
+    """Feeds camera frames to a LIVE_STREAM detector, one at a time.
+
+    submit() sends a frame only when no other is being detected and drops
+    it otherwise; on_result, the detector's result callback, puts each
+    result in the results slot. Timestamps come from the capture times.
+    """
+
+    def __init__(self, results: LatestSlot):
+        self._results = results
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._last_timestamp_ms = -1
+        # (timestamp_ms, frame, rgb, submitted_at) of the frame in flight.
+        self._pending = None
+        self.dropped = 0
+        self.rate = RateMeter()
+
+    def submit(self, detector: PoseDetector, frame: CapturedFrame):
+        with self._lock:
+            now = time.perf_counter()
+            if self._pending is not None and now - self._pending[3] < RESULT_TIMEOUT_S:
+                self.dropped += 1
+                return
+            timestamp_ms = max(
+                int((frame.captured_at - self._origin) * 1000),
+                self._last_timestamp_ms + 1,
+            )
+            self._last_timestamp_ms = timestamp_ms
+            rgb = cv2.cvtColor(frame.image, cv2.COLOR_BGR2RGB)
+            self._pending = (timestamp_ms, frame, rgb, now)
+        # Outside the lock: some backends call on_result before returning.
+        detector.detect_async(rgb, timestamp_ms)
+
+    def on_result(self, detection: Detection, timestamp_ms: int):
+        with self._lock:
+            if self._pending is None or self._pending[0] != timestamp_ms:
+                return
+            _, frame, rgb, _ = self._pending
+            self._pending = None
+        self.rate.tick()
+        self._results.put(LiveResult(frame, rgb, detection))
+
+
+class CameraCapture(threading.Thread):
+    """Reads a camera as fast as it delivers, passing each frame to on_frame."""
+
+    def __init__(self, camera: int, on_frame: Callable[[CapturedFrame], None]):
+        super().__init__(name="camera-capture", daemon=True)
+        self._camera = camera
+        self._on_frame = on_frame
+        self._stop_event = threading.Event()
+        self.rate = RateMeter()
+
+    def run(self):
+        cap = cv2.VideoCapture(self._camera)
+        # A one-frame driver queue where the backend supports it.
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        frame_id = 0
+        try:
+            while cap.isOpened() and not self._stop_event.is_set():
+                success, image = cap.read()
+                if not success:
+                    print("Ignoring empty camera frame.")
+                    continue
+                self.rate.tick()
+                self._on_frame(CapturedFrame(frame_id, time.perf_counter(), image))
+                frame_id += 1
+        finally:
+            cap.release()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# ================================
+# Display
+# ================================
+
+
+def draw_stats(image, capture_fps: float, inference_fps: float, display_fps: float,
+               latency_ms: float):
+    """Write frame rates and capture-to-display latency in the bottom-left corner."""
+    lines = [
+        f"Capture {capture_fps:.0f} | Inference {inference_fps:.0f} | "
+        f"Display {display_fps:.0f} fps",
+        f"Latency {latency_ms:.0f} ms",
+    ]
+    y = image.shape[0] - 12 - 22 * (len(lines) - 1)
+    for text in lines:
+        # Text on a dark background so it stays readable over any scene
+        (text_width, text_height), baseline = cv2.getTextSize(
+            text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1
+        )
+        cv2.rectangle(image, (6, y - text_height - 4), (14 + text_width, y + baseline),
+                      (0, 0, 0), -1)
+        cv2.putText(image, text, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+        y += 22
+
+
+def run_live(
+    annotate: Callable[[np.ndarray, np.ndarray | None], np.ndarray],
+    camera: int = 1,
+    model_path: str = "pose_landmarker.task",
+    backend: str = "mediapipe",
+    window_name: str = WINDOW_NAME,
+):
+    """Show annotated camera frames until 'q' is pressed or the camera closes.
+
+    annotate(rgb_image, landmarks) classifies and draws one result and
+    returns the RGB image to display, where landmarks is a (33, 4) array or
+    None. The detector is built in LIVE_STREAM mode from model_path on the
+    given backend. Display stays on the calling thread, since some
+    platforms only allow GUI calls from the main thread.
+    """
+    results = LatestSlot()
+    inference = StreamingInference(results)
+    detector = create_detector(
+        backend,
+        model_path=model_path,
+        mode=DetectorMode.LIVE_STREAM,
+        result_callback=inference.on_result,
+    )
+    capture = CameraCapture(camera, lambda frame: inference.submit(detector, frame))
+    display_rate = RateMeter()
+    latency_ms = None
+
+    capture.start()
+    try:
+        while capture.is_alive():
+            result = results.get(timeout=0.01)
+            if result is not None:
+                annotated_image = annotate(result.rgb, result.detection.landmarks)
+                annotated_image = cv2.cvtColor(annotated_image, cv2.COLOR_RGB2BGR)
+
+                display_rate.tick()
+                sample_ms = (time.perf_counter() - result.frame.captured_at) * 1000
+                latency_ms = sample_ms if latency_ms is None else (
+                    LATENCY_SMOOTHING * sample_ms + (1 - LATENCY_SMOOTHING) * latency_ms
+                )
+                draw_stats(annotated_image, capture.rate.rate, inference.rate.rate,
+                           display_rate.rate, latency_ms)
+                cv2.imshow(window_name, annotated_image)
+
+            # Break the loop if 'q' is pressed.
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        capture.stop()
+        capture.join()
+        detector.close()
+        cv2.destroyAllWindows()
@@ -1,10 +1,8 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 import matplotlib.pyplot as plt
 
-# Initialize MediaPipe Pose with segmentation enabled
-mp_pose = mp.solutions.pose
+from backend.detectors import DetectorMode, create_detector
 
 # Load the image
 image_path = "images/warrior_1.png"
@@ -12,8 +10,12 @@ image = cv2.imread(image_path)
 image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
 # Perform pose estimation with segmentation enabled
-with mp_pose.Pose(static_image_mode=True, enable_segmentation=True) as pose:
-    results = pose.process(image_rgb)
+with create_detector(
+    model_path="pose_landmarker.task",
+    mode=DetectorMode.IMAGE,
+    output_segmentation_masks=True,
+) as pose:
+    results = pose.detect(image_rgb)
     
     # Get the segmentation mask (values between 0 and 1)
     mask = results.segmentation_mask
@@ -37,7 +39,8 @@ with mp_pose.Pose(static_image_mode=True, enable_segmentation=True) as pose:
     cv2.drawContours(output_image, contours, -1, outline_color, thickness=3)
 
 # Draw the pose landmarks on the image
-# mp_pose.Pose.draw_landmarks(output_image, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+# for x, y, _, _ in results.landmarks:
+#     cv2.circle(output_image, (int(x * output_image.shape[1]), int(y * output_image.shape[0])), 5, (0, 255, 0), -1)
 
 # Plot the result
 plt.figure(figsize=(12, 8))
@@ -3,6 +3,18 @@ import { ArrowLeft, Upload, Play, BarChart3, Loader2 } from 'lucide-react';
 
 const API_BASE = 'http://localhost:8000';
 
+// Parse one Server-Sent Events message ("event: ...\ndata: ...") into { event, data }.
+const parseSseMessage = (block) => {
+    let event = 'message';
+    const dataLines = [];
+    for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+    }
+    if (dataLines.length === 0) return null; // keep-alive comment
+    return { event, data: JSON.parse(dataLines.join('\n')) };
+};
+
 const UploadVideoPage = ({ onHomeClick }) => {
     const [poses, setPoses] = useState([]);
     const [selectedPose, setSelectedPose] = useState('');
@@ -10,6 +22,8 @@ const UploadVideoPage = ({ onHomeClick }) => {
     const [videoPreviewUrl, setVideoPreviewUrl] = useState(null);
     const [isAnalyzing, setIsAnalyzing] = useState(false);
     const [results, setResults] = useState(null);
+    const [progress, setProgress] = useState(null);
+    const [partialScores, setPartialScores] = useState([]);
     const [error, setError] = useState(null);
     const [dragActive, setDragActive] = useState(false);
     const fileInputRef = useRef(null);
@@ -55,13 +69,15 @@ const UploadVideoPage = ({ onHomeClick }) => {
         setIsAnalyzing(true);
         setError(null);
         setResults(null);
+        setProgress(null);
+        setPartialScores([]);
 
         const formData = new FormData();
         formData.append('video', videoFile);
         formData.append('pose_name', selectedPose);
 
         try {
-            const res = await fetch(`${API_BASE}/api/analyze`, {
+            const res = await fetch(`${API_BASE}/api/analyze/stream`, {
                 method: 'POST',
                 body: formData,
             });
@@ -71,8 +87,51 @@ const UploadVideoPage = ({ onHomeClick }) => {
                 throw new Error(errData.detail || `Server error: ${res.status}`);
             }
 
-            const data = await res.json();
-            setResults(data);
+            // Read the event stream, rendering score batches as they arrive
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let scores = [];
+            let finished = false;
+
+            while (!finished) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const message = parseSseMessage(buffer.slice(0, boundary));
+                    buffer = buffer.slice(boundary + 2);
+                    if (!message) continue;
+
+                    const { event, data } = message;
+                    if (event === 'start') {
+                        setProgress({ framesDone: 0, totalFrames: data.total_frames, fps: data.fps });
+                    } else if (event === 'scores') {
+                        scores = scores.concat(data.scores);
+                        setPartialScores(scores);
+                        setProgress((prev) => ({
+                            ...prev,
+                            framesDone: data.frames_done,
+                            totalFrames: data.total_frames,
+                            processingFps: data.processing_fps,
+                            etaS: data.eta_s,
+                        }));
+                    } else if (event === 'result') {
+                        setResults(data);
+                        finished = true;
+                    } else if (event === 'error') {
+                        throw new Error(data.detail || 'Analysis failed');
+                    } else if (event === 'cancelled') {
+                        throw new Error('Analysis was cancelled');
+                    }
+                }
+            }
+
+            if (!finished) {
+                throw new Error('Connection closed before the analysis finished');
+            }
         } catch (err) {
             setError(err.message || 'Analysis failed');
         } finally {
@@ -167,7 +226,11 @@ const UploadVideoPage = ({ onHomeClick }) => {
                         {isAnalyzing ? (
                             <>
                                 <Loader2 className="w-5 h-5 animate-spin" />
-                                Analyzing... This may take a while
+                                {progress
+                                    ? `Analyzing... ${progress.totalFrames
+                                        ? Math.round((progress.framesDone / progress.totalFrames) * 100)
+                                        : 0}%`
+                                    : 'Uploading...'}
                             </>
                         ) : (
                             <>
@@ -178,6 +241,38 @@ const UploadVideoPage = ({ onHomeClick }) => {
                     </button>
                 )}
 
+                {/* Live Progress */}
+                {isAnalyzing && progress && (
+                    <div className="bg-white rounded-2xl shadow-lg border border-gray-100 p-6 mb-6 max-w-2xl">
+                        <div className="flex justify-between text-sm text-gray-600 mb-2">
+                            <span>
+                                {progress.framesDone} / {progress.totalFrames} frames
+                            </span>
+                            <span>
+                                {progress.processingFps != null && `${progress.processingFps.toFixed(1)} fps`}
+                                {progress.etaS != null && ` · ~${Math.ceil(progress.etaS)}s left`}
+                            </span>
+                        </div>
+                        <div className="w-full bg-gray-100 rounded-full h-2 mb-4">
+                            <div
+                                className="bg-purple-600 h-2 rounded-full transition-all duration-300"
+                                style={{
+                                    width: `${progress.totalFrames
+                                        ? Math.min(100, (progress.framesDone / progress.totalFrames) * 100)
+                                        : 0}%`,
+                                }}
+                            />
+                        </div>
+                        {partialScores.length > 1 && (
+                            <ScoreChart
+                                scores={partialScores}
+                                fps={progress.fps}
+                                totalFrames={progress.totalFrames}
+                            />
+                        )}
+                    </div>
+                )}
+
                 {/* Error */}
                 {error && (
                     <div className="bg-red-50 border border-red-200 text-red-700 rounded-xl p-4 mb-6">
@@ -251,7 +346,8 @@ const StatCard = ({ label, value, color }) => {
     );
 };
 
-const ScoreChart = ({ scores, fps }) => {
+// totalFrames fixes the time axis to the whole video while scores are still arriving
+const ScoreChart = ({ scores, fps, totalFrames }) => {
     if (!scores || scores.length === 0) return null;
 
     const width = 800;
@@ -260,7 +356,7 @@ const ScoreChart = ({ scores, fps }) => {
     const chartW = width - pad.left - pad.right;
     const chartH = height - pad.top - pad.bottom;
 
-    const maxTime = (scores.length - 1) / fps;
+    const maxTime = (Math.max(totalFrames || 0, scores.length) - 1) / fps;
 
     // Downsample for rendering performance if > 500 points
     const step = scores.length > 500 ? Math.ceil(scores.length / 500) : 1;
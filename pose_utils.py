@@ -149,6 +149,46 @@ def classify_plank_pose_refined(left_arm_angle, right_arm_angle, left_leg_angle,
         return True
     return False
 
+def classify_pose_refined(landmarks):
+    """Classifies a pose from 33 (x, y) landmark points with the refined rules.
+
+    Returns the pose name, or "Unknown" if no rule matches.
+    """
+    def point(idx):
+        return [landmarks[idx][0], landmarks[idx][1]]
+
+    # Get coordinates
+    shoulder_l, elbow_l, wrist_l = point(11), point(13), point(15)
+    shoulder_r, elbow_r, wrist_r = point(12), point(14), point(16)
+    hip_l, knee_l, ankle_l = point(23), point(25), point(27)
+    hip_r, knee_r, ankle_r = point(24), point(26), point(28)
+
+    # Calculate angles
+    left_arm_angle = calculate_angle(shoulder_l, elbow_l, wrist_l)
+    right_arm_angle = calculate_angle(shoulder_r, elbow_r, wrist_r)
+    left_leg_angle = calculate_angle(hip_l, knee_l, ankle_l)
+    right_leg_angle = calculate_angle(hip_r, knee_r, ankle_r)
+    left_shoulder_angle = calculate_angle(hip_l, shoulder_l, wrist_l)
+    right_shoulder_angle = calculate_angle(hip_r, shoulder_r, wrist_r)
+
+    # These are crucial for Plank Logic (Shoulder-Hip-Knee)
+    left_body_angle = calculate_angle(shoulder_l, hip_l, knee_l)
+    right_body_angle = calculate_angle(shoulder_r, hip_r, knee_r)
+
+    if classify_warrior2_refined(left_arm_angle, right_arm_angle, left_leg_angle, right_leg_angle, shoulder_l, wrist_l, shoulder_r, wrist_r):
+        return "Warrior 2"
+    if classify_warrior1_refined(left_arm_angle, right_arm_angle, left_leg_angle, right_leg_angle, left_shoulder_angle, right_shoulder_angle):
+        return "Warrior 1"
+    if classify_tree_pose_refined(left_leg_angle, right_leg_angle, ankle_l, ankle_r, knee_l, knee_r):
+        return "Tree Pose"
+    if classify_triangle_pose_refined(left_arm_angle, right_arm_angle, left_leg_angle, right_leg_angle, left_body_angle, right_body_angle, left_shoulder_angle, right_shoulder_angle):
+        return "Triangle Pose"
+    if classify_mountain_pose_refined(left_arm_angle, right_arm_angle, left_leg_angle, right_leg_angle, left_shoulder_angle, right_shoulder_angle):
+        return "Mountain Pose"
+    if classify_plank_pose_refined(left_arm_angle, right_arm_angle, left_leg_angle, right_leg_angle, left_body_angle, right_body_angle):
+        return "Plank Pose"
+    return "Unknown"
+
 def classify_warrior2(left_arm_angle, right_arm_angle, left_leg_angle, right_leg_angle):
     """Classifies Warrior 2 pose."""
     warrior_2_left_bent = (left_arm_angle > 160 and left_arm_angle < 200 and
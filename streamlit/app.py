@@ -9,9 +9,14 @@ import json
 import cv2
 import tempfile
 import os
+import sys
 import mediapipe as mp
-from mediapipe.tasks.python import vision
-from mediapipe.tasks import python
+
+# Streamlit runs the app from streamlit/, so make the repository root importable.
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from backend.detectors import DETECTOR_BACKENDS, DetectorMode, create_detector
+from backend.pose_scoring import LandmarkBuffer, prepare_frame
+from backend.tracing import NULL_TRACER, Tracer
 
 # ================================
 # Constants and Configuration
@@ -35,6 +40,9 @@ LANDMARKS = {
 ANGLE_TOLERANCE = 15.0
 SCORING_SIGMA = 25.0
 
+# Longest frame side fed to the landmarker (None keeps full resolution)
+MAX_INFERENCE_SIDE_OPTIONS = [None, 1280, 960, 640, 480]
+
 # Available poses and their reference files
 POSE_OPTIONS = {
     "Tree Pose (Vrksasana)": ("ground_truth_tree.json", "Vrksasana"),
@@ -150,28 +158,34 @@ def load_reference_pose(pose_name):
     return pose_library[pose_key]
 
 
-def load_pose_landmarker():
-    """Load MediaPipe PoseLandmarker model."""
+def load_pose_landmarker(backend="mediapipe", fps=30.0):
+    """Load a VIDEO-mode pose detector.
+
+    "mediapipe" runs the heavy PoseLandmarker model; "replay" returns
+    recorded poses at the video's fps without running a model.
+    """
+    if backend == "replay":
+        return create_detector("replay", mode=DetectorMode.VIDEO, fps=fps)
     model_path = os.path.join(os.path.dirname(__file__), "..", "pose_landmarker_heavy.task")
-    
-    base_options = mp.tasks.BaseOptions(model_asset_path=model_path)
-    options = mp.tasks.vision.PoseLandmarkerOptions(
-        base_options=base_options,
-        running_mode=vision.RunningMode.VIDEO,
-        output_segmentation_masks=True
-    )
-    return mp.tasks.vision.PoseLandmarker.create_from_options(options)
+    return create_detector(backend, model_path=model_path, mode=DetectorMode.VIDEO)
 
 
-def batch_process_video(video_path, reference_angles, progress_bar, status_text):
-    """Process video and score each frame."""
-    landmarker = load_pose_landmarker()
-    
+def batch_process_video(video_path, reference_angles, progress_bar, status_text, max_side=None,
+                        tracer=NULL_TRACER, detector_backend="mediapipe"):
+    """Process video and score each frame.
+
+    Landmarks are returned as a float32 (frames, 33, 4) array of x, y, z and
+    visibility, with a validity bitmap marking frames that had a detection.
+    A backend.tracing.Tracer, if given, gets a span per frame for each step.
+    """
     cap = cv2.VideoCapture(video_path)
     fps = cap.get(cv2.CAP_PROP_FPS)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     
-    all_frame_landmarks = []
+    landmarker = load_pose_landmarker(detector_backend, fps)
+    
+    # Preallocated from the reported frame count, grown if it was too low
+    buffer = LandmarkBuffer(total_frames)
     scores_over_time = []
     
     # Phase 1: Extract landmarks
@@ -179,22 +193,19 @@ def batch_process_video(video_path, reference_angles, progress_bar, status_text)
     frame_index = 0
     
     while cap.isOpened():
-        ret, frame = cap.read()
+        with tracer.span("read", frame=frame_index):
+            ret, frame = cap.read()
         if not ret:
             break
         
-        mp_image = mp.Image(
-            image_format=mp.ImageFormat.SRGB, 
-            data=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        )
+        with tracer.span("cvtColor", frame=frame_index):
+            rgb_frame = prepare_frame(frame, max_side)
         
         timestamp_ms = int((frame_index / fps) * 1000)
-        detection_result = landmarker.detect_for_video(mp_image, timestamp_ms)
+        with tracer.span("detect_for_video", frame=frame_index):
+            detection = landmarker.detect_for_video(rgb_frame, timestamp_ms)
         
-        if detection_result.pose_landmarks:
-            all_frame_landmarks.append(detection_result.pose_landmarks[0])
-        else:
-            all_frame_landmarks.append(None)
+        buffer.append(frame_index, detection.landmarks)
         
         frame_index += 1
         progress_bar.progress(frame_index / (total_frames * 2))
@@ -202,27 +213,70 @@ def batch_process_video(video_path, reference_angles, progress_bar, status_text)
     cap.release()
     landmarker.close()
     
+    all_landmarks = buffer.landmarks
+    valid = buffer.valid
+    
     # Phase 2: Score frames
     status_text.text("Scoring poses...")
     
-    for i, landmarks in enumerate(all_frame_landmarks):
-        if landmarks is None:
+    for i in range(frame_index):
+        if not valid[i]:
             scores_over_time.append(0.0)
             continue
         
-        landmarks_np = np.array([[lm.x, lm.y] for lm in landmarks])
-        norm_landmarks = normalize_landmarks(landmarks_np)
-        angles = extract_joint_angles(norm_landmarks)
-        mae = compute_mae(angles, reference_angles)
-        score = mae_to_score(mae)
+        with tracer.span("score", frame=i):
+            landmarks_np = all_landmarks[i, :, :2].astype(np.float64)
+            norm_landmarks = normalize_landmarks(landmarks_np)
+            angles = extract_joint_angles(norm_landmarks)
+            mae = compute_mae(angles, reference_angles)
+            score = mae_to_score(mae)
         scores_over_time.append(score)
         
-        progress_bar.progress(0.5 + (i + 1) / (len(all_frame_landmarks) * 2))
+        progress_bar.progress(0.5 + (i + 1) / (frame_index * 2))
     
-    return all_frame_landmarks, scores_over_time, fps
+    return all_landmarks, valid, scores_over_time, fps
+
 
+def draw_overlay(frame, landmarks, score, width, height):
+    """Draw the pose skeleton and score onto a BGR frame in place."""
+    # Draw landmarks
+    for x, y, _, _ in landmarks:
+        cv2.circle(frame, (int(x * width), int(y * height)), 5, (0, 255, 0), -1)
+    
+    # Draw connections
+    connections = mp.tasks.vision.PoseLandmarksConnections.POSE_LANDMARKS
+    for connection in connections:
+        start_idx = connection.start
+        end_idx = connection.end
+        
+        if start_idx < len(landmarks) and end_idx < len(landmarks):
+            start_point = (int(landmarks[start_idx, 0] * width), 
+                           int(landmarks[start_idx, 1] * height))
+            end_point = (int(landmarks[end_idx, 0] * width), 
+                         int(landmarks[end_idx, 1] * height))
+            cv2.line(frame, start_point, end_point, (255, 0, 0), 2)
+    
+    # Draw score text with background for visibility
+    score_text = f"Score: {int(score)}"
+    (text_width, text_height), _ = cv2.getTextSize(
+        score_text, cv2.FONT_HERSHEY_SIMPLEX, 1.2, 3
+    )
+    cv2.rectangle(frame, (45, 55), (55 + text_width, 110), (0, 0, 0), -1)
+    
+    # Color based on score
+    if score >= 80:
+        color = (0, 255, 0)  # Green
+    elif score >= 50:
+        color = (0, 255, 255)  # Yellow
+    else:
+        color = (0, 0, 255)  # Red
+    
+    cv2.putText(frame, score_text, (50, 100), 
+                cv2.FONT_HERSHEY_SIMPLEX, 1.2, color, 3)
 
-def generate_output_video(input_path, output_path, all_landmarks, all_scores):
+
+def generate_output_video(input_path, output_path, all_landmarks, valid, all_scores,
+                          tracer=NULL_TRACER):
     """Generate video with pose overlay and score display."""
     cap = cv2.VideoCapture(input_path)
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -235,52 +289,18 @@ def generate_output_video(input_path, output_path, all_landmarks, all_scores):
     frame_index = 0
     
     while cap.isOpened():
-        ret, frame = cap.read()
+        with tracer.span("read", frame=frame_index):
+            ret, frame = cap.read()
         if not ret:
             break
         
-        if frame_index < len(all_landmarks):
-            landmarks = all_landmarks[frame_index]
-            score = all_scores[frame_index]
-            
-            if landmarks:
-                # Draw landmarks
-                for landmark in landmarks:
-                    x, y = int(landmark.x * width), int(landmark.y * height)
-                    cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)
-                
-                # Draw connections
-                connections = mp.tasks.vision.PoseLandmarksConnections.POSE_LANDMARKS
-                for connection in connections:
-                    start_idx = connection.start
-                    end_idx = connection.end
-                    
-                    if start_idx < len(landmarks) and end_idx < len(landmarks):
-                        start_point = (int(landmarks[start_idx].x * width), 
-                                       int(landmarks[start_idx].y * height))
-                        end_point = (int(landmarks[end_idx].x * width), 
-                                     int(landmarks[end_idx].y * height))
-                        cv2.line(frame, start_point, end_point, (255, 0, 0), 2)
-                
-                # Draw score text with background for visibility
-                score_text = f"Score: {int(score)}"
-                (text_width, text_height), _ = cv2.getTextSize(
-                    score_text, cv2.FONT_HERSHEY_SIMPLEX, 1.2, 3
-                )
-                cv2.rectangle(frame, (45, 55), (55 + text_width, 110), (0, 0, 0), -1)
-                
-                # Color based on score
-                if score >= 80:
-                    color = (0, 255, 0)  # Green
-                elif score >= 50:
-                    color = (0, 255, 255)  # Yellow
-                else:
-                    color = (0, 0, 255)  # Red
-                
-                cv2.putText(frame, score_text, (50, 100), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, color, 3)
+        if frame_index < len(all_landmarks) and valid[frame_index]:
+            with tracer.span("overlay", frame=frame_index):
+                draw_overlay(frame, all_landmarks[frame_index], all_scores[frame_index],
+                             width, height)
         
-        out.write(frame)
+        with tracer.span("encode", frame=frame_index):
+            out.write(frame)
         frame_index += 1
     
     cap.release()
@@ -313,6 +333,28 @@ def main():
     # st.sidebar.markdown("---")
     # st.sidebar.subheader("Reference Angles")
     reference_angles = load_reference_pose(selected_pose)
+
+    max_side = st.sidebar.selectbox(
+        "Max Inference Resolution",
+        options=MAX_INFERENCE_SIDE_OPTIONS,
+        index=0,
+        format_func=lambda side: "Full" if side is None else f"{side}px",
+        help="Downscale large videos before pose detection for faster analysis"
+    )
+    detector_backend = st.sidebar.selectbox(
+        "Pose Detector",
+        options=list(DETECTOR_BACKENDS),
+        index=0,
+        format_func=lambda backend: {"mediapipe": "MediaPipe", "replay": "Replay (recorded poses)"}[backend],
+        help="Replay serves recorded poses instead of running the model, "
+             "to try the app without a model file"
+    )
+    record_trace = st.sidebar.checkbox(
+        "Record Trace",
+        value=False,
+        help="Time every frame's read, color conversion, detection, scoring, "
+             "overlay and encode steps, for chrome://tracing or Perfetto"
+    )
     # for joint, angle in reference_angles.items():
     #     st.sidebar.text(f"{joint}: {angle:.1f}°")
     
@@ -342,16 +384,20 @@ def main():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
+                tracer = Tracer("streamlit analysis") if record_trace else NULL_TRACER
+                
                 try:
                     # Process video
-                    landmarks, scores, fps = batch_process_video(
-                        input_path, reference_angles, progress_bar, status_text
+                    landmarks, valid, scores, fps = batch_process_video(
+                        input_path, reference_angles, progress_bar, status_text, max_side,
+                        tracer, detector_backend
                     )
                     
                     # Generate output video
                     status_text.text("Generating output video...")
                     output_path = tempfile.mktemp(suffix='.mp4')
-                    generate_output_video(input_path, output_path, landmarks, scores)
+                    generate_output_video(input_path, output_path, landmarks, valid, scores,
+                                          tracer)
                     
                     progress_bar.progress(1.0)
                     status_text.text("Processing complete!")
@@ -360,6 +406,9 @@ def main():
                     st.session_state['scores'] = scores
                     st.session_state['output_path'] = output_path
                     st.session_state['fps'] = fps
+                    st.session_state['trace'] = (
+                        json.dumps(tracer.to_dict()) if tracer.enabled else None
+                    )
                     st.session_state['processed'] = True
                     
                 except Exception as e:
@@ -385,6 +434,14 @@ def main():
             with col_stat4:
                 st.metric("Frames Analyzed", len(scores))
             
+            if st.session_state.get('trace'):
+                st.download_button(
+                    label="Download Trace",
+                    data=st.session_state['trace'],
+                    file_name="yoga_trace.json",
+                    mime="application/json"
+                )
+            
             # Output video and chart
             # col_out1, col_out2 = st.columns(2)
             
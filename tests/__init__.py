@@ -0,0 +1,17 @@
+"""
+Tests for the FastAPI backend.
+They run on the replay detector, so no MediaPipe model or footage is
+needed, and use a throwaway cache directory. Settings are read when
+backend modules are imported, so they are set here, before any test
+module imports them.
+
+Run with:
+    python -m pytest tests
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("POSE_DETECTOR", "replay")
+os.environ.setdefault("POSE_POOL_SIZE", "2")
+os.environ["POSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="pose_test_cache_")
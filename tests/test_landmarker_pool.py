@@ -0,0 +1,81 @@
+"""
+Failed landmarker rebuilds are retried, and checkouts give up after a timeout.
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from backend import landmarker_pool
+from backend.landmarker_pool import LandmarkerPool, LandmarkerUnavailable
+
+
+class FakeLandmarker:
+    def close(self):
+        pass
+
+
+class FlakyFactory:
+    """Builds landmarkers, except for the calls listed in failures."""
+
+    def __init__(self, failures=()):
+        self.failures = set(failures)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, profile):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call in self.failures:
+            raise RuntimeError(f"build {call} failed")
+        return FakeLandmarker()
+
+
+class LandmarkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(landmarker_pool, "REBUILD_RETRY_S", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait_for_idle(self, pool, count):
+        deadline = time.monotonic() + 5
+        while pool._idle.qsize() < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pool._idle.qsize(), count)
+
+    def test_failed_rebuild_is_retried(self):
+        # Builds 1-2 fill the pool; the first two rebuilds fail.
+        factory = FlakyFactory(failures={3, 4})
+        pool = LandmarkerPool(2, factory=factory)
+        self.addCleanup(pool.close)
+        with self.assertLogs(landmarker_pool.logger, "ERROR"):
+            pool.start()
+            with pool.checkout():
+                pass
+            self.wait_for_idle(pool, 2)
+        self.assertEqual(factory.calls, 5)
+
+    def test_checkout_times_out(self):
+        pool = LandmarkerPool(1, factory=FlakyFactory())
+        self.addCleanup(pool.close)
+        pool.start()
+        with pool.checkout():
+            with self.assertRaises(LandmarkerUnavailable):
+                with pool.checkout(timeout=0.01):
+                    pass
+
+    def test_close_stops_retrying(self):
+        factory = FlakyFactory(failures=range(2, 1000))
+        pool = LandmarkerPool(1, factory=factory)
+        pool.start()
+        with self.assertLogs(landmarker_pool.logger, "ERROR"):
+            with pool.checkout():
+                pass
+            time.sleep(0.05)
+            pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Parallel analysis scores every frame as the serial path does.
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from backend.parallel import (
+    MIN_SEGMENT_FRAMES,
+    PARALLEL_SCORE_TOLERANCE,
+    ParallelAnalyzer,
+    split_segments,
+)
+from backend.pose_scoring import (
+    DEFAULT_PROFILE,
+    POSE_OPTIONS,
+    load_pose_landmarker,
+    load_reference_pose,
+    process_video,
+)
+from benchmarks.synthetic import make_synthetic_video
+
+WORKERS = 3
+
+
+class ParallelMatchesSerialTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        # Odd length, so the last segment is shorter than the others.
+        cls.video = make_synthetic_video(
+            os.path.join(cls.tmp.name, "video.mp4"),
+            frames=MIN_SEGMENT_FRAMES * WORKERS + 7,
+            size=(160, 120),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_scores_match_serial(self):
+        reference_angles = load_reference_pose(next(iter(POSE_OPTIONS)))
+
+        landmarker = load_pose_landmarker(DEFAULT_PROFILE)
+        try:
+            serial, serial_fps = process_video(self.video, reference_angles, landmarker)
+        finally:
+            landmarker.close()
+
+        analyzer = ParallelAnalyzer(WORKERS)
+        try:
+            parallel, parallel_fps = analyzer.process_video(self.video, reference_angles)
+        finally:
+            analyzer.close()
+
+        self.assertEqual(len(split_segments(len(serial), WORKERS)), WORKERS)
+        self.assertEqual(parallel_fps, serial_fps)
+        self.assertEqual(len(parallel), len(serial))
+        diff = np.abs(np.array(parallel) - np.array(serial))
+        self.assertLessEqual(diff.max(), PARALLEL_SCORE_TOLERANCE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+The scalar per-frame scorer and the vectorized array scorer agree.
+"""
+
+import unittest
+
+import numpy as np
+
+from backend.pose_scoring import (
+    JOINT_SETS,
+    POSE_OPTIONS,
+    load_reference_pose,
+    score_landmark_array,
+    score_landmarks_xy,
+)
+from backend.replay import load_recorded_poses
+
+
+class ScalarMatchesVectorizedTest(unittest.TestCase):
+    def test_every_pose_and_joint_set(self):
+        # Recorded poses with a little noise, so frames score well above 0.
+        poses = np.stack([pose[:, :2] for pose in load_recorded_poses().values()])
+        rng = np.random.default_rng(0)
+        xy = poses[:, None] + rng.normal(0.0, 0.01, (len(poses), 10, 33, 2))
+        xy = xy.reshape(-1, 33, 2)
+        for pose_name in POSE_OPTIONS:
+            reference_angles = load_reference_pose(pose_name)
+            for joint_set, joints in JOINT_SETS.items():
+                with self.subTest(pose=pose_name, joint_set=joint_set):
+                    vectorized = score_landmark_array(xy, reference_angles, joints=joints)
+                    scalar = [
+                        score_landmarks_xy(frame, reference_angles, joints)
+                        for frame in xy
+                    ]
+                    self.assertTrue((vectorized > 0).any())
+                    np.testing.assert_allclose(scalar, vectorized, atol=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
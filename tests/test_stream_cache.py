@@ -0,0 +1,94 @@
+"""
+Results cached by /api/analyze/stream and read back by /api/analyze.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.pose_scoring import POSE_OPTIONS
+from benchmarks.synthetic import make_synthetic_video
+
+POSE_NAME = next(iter(POSE_OPTIONS))
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    """(event, data) pairs from a Server-Sent Events body, skipping keepalives."""
+    events = []
+    for message in body.split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in message.splitlines() if ": " in line
+        )
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class StreamThenAnalyzeTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def _video(self, frames: int) -> bytes:
+        path = os.path.join(self.workdir.name, f"video_{frames}.mp4")
+        make_synthetic_video(path, frames, 30.0, (160, 120))
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _post(self, client, url: str, video: bytes, stride: int):
+        return client.post(
+            url,
+            data={"pose_name": POSE_NAME, "stride": str(stride)},
+            files={"video": ("video.mp4", video, "video/mp4")},
+        )
+
+    def test_cached_stream_result_matches_fresh_analysis(self):
+        streamed_video = self._video(61)
+        fresh_video = self._video(63)
+        with TestClient(app) as client:
+            response = self._post(client, "/api/analyze/stream", streamed_video, 3)
+            self.assertEqual(response.status_code, 200)
+            events = parse_sse(response.text)
+            self.assertEqual(events[-1][0], "result")
+            self.assertEqual(events[-1][1]["inferred_frames"], list(range(0, 61, 3)))
+
+            cached = self._post(client, "/api/analyze", streamed_video, 3).json()
+            fresh = self._post(client, "/api/analyze", fresh_video, 3).json()
+
+        self.assertTrue(cached["cached"])
+        self.assertNotIn("cached", fresh)
+        self.assertEqual(cached["inferred_frames"], list(range(0, 61, 3)))
+        self.assertEqual(fresh["inferred_frames"], list(range(0, 63, 3)))
+        self.assertEqual(cached["scores"], events[-1][1]["scores"])
+
+    def test_stream_from_cached_landmarks_keeps_sampling_info(self):
+        video = self._video(47)
+        with TestClient(app) as client:
+            # Fills the landmark cache, so the stream below only scores.
+            analyzed = self._post(client, "/api/analyze", video, 2).json()
+            other_pose = next(name for name in POSE_OPTIONS if name != POSE_NAME)
+            response = client.post(
+                "/api/analyze/stream",
+                data={"pose_name": other_pose, "stride": "2"},
+                files={"video": ("video.mp4", video, "video/mp4")},
+            )
+            streamed = parse_sse(response.text)[-1][1]
+            cached = client.post(
+                "/api/analyze",
+                data={"pose_name": other_pose, "stride": "2"},
+                files={"video": ("video.mp4", video, "video/mp4")},
+            ).json()
+
+        self.assertEqual(streamed["inferred_frames"], analyzed["inferred_frames"])
+        self.assertTrue(cached["cached"])
+        self.assertEqual(cached["inferred_frames"], analyzed["inferred_frames"])
+
+
+if __name__ == "__main__":
+    unittest.main()